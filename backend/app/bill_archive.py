@@ -0,0 +1,269 @@
+"""
+Bill Archive - Monthly hot/cold partitioning of bills and bill items
+
+Closed months are moved out of `bills` / `bill_items` into per-period
+tables (`bills_YYYY_MM` / `bill_items_YYYY_MM`) and recorded in
+`bill_archive_periods`. The hot tables then hold only recent activity.
+Queries that name a date range union in an archive table only when the
+range reaches into an archived month; everything else reads the hot
+tables alone.
+
+Run monthly, e.g. from cron (from backend/):
+    python -m app.bill_archive [--keep-months 3] [--dry-run]
+"""
+import argparse
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Column, Index, MetaData, Table, func, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import FromClause
+
+from app.config import settings
+from app.models.bill import Bill
+from app.models.bill_archive import BillArchivePeriod
+from app.models.bill_item import BillItem
+
+BILL_COLUMNS = [column.name for column in Bill.__table__.columns]
+ITEM_COLUMNS = [column.name for column in BillItem.__table__.columns]
+
+# Archive tables are created on demand, so they live outside Base.metadata
+_archive_metadata = MetaData()
+
+
+def period_key(day: date) -> str:
+    return f"{day.year:04d}_{day.month:02d}"
+
+
+def period_bounds(period: str) -> Tuple[datetime, datetime]:
+    """[start, end) of the month named by `period`"""
+    year, month = (int(part) for part in period.split("_"))
+    start = datetime(year, month, 1)
+    end = datetime(year + month // 12, month % 12 + 1, 1)
+    return start, end
+
+
+def archive_tables(period: str) -> Tuple[Table, Table]:
+    bills_name, items_name = f"bills_{period}", f"bill_items_{period}"
+    if bills_name not in _archive_metadata.tables:
+        Table(bills_name, _archive_metadata, *(
+            Column(column.name, column.type, primary_key=column.primary_key)
+            for column in Bill.__table__.columns
+        ))
+        items = Table(items_name, _archive_metadata, *(
+            Column(column.name, column.type, primary_key=column.primary_key)
+            for column in BillItem.__table__.columns
+        ))
+        Index(f"ix_{items_name}_bill_id", items.c.bill_id)
+    return _archive_metadata.tables[bills_name], _archive_metadata.tables[items_name]
+
+
+# ---------------------------------------------------------------------------
+# Query layer
+# ---------------------------------------------------------------------------
+
+def archived_periods_query(start: date, end: date):
+    """Archived periods overlapping [start, end] (both inclusive)"""
+    return select(BillArchivePeriod.period).where(
+        BillArchivePeriod.period.between(period_key(start), period_key(end))
+    ).order_by(BillArchivePeriod.period)
+
+
+def bills_source(periods: List[str]) -> FromClause:
+    """The hot bills table, unioned with the given archive periods if any"""
+    if not periods:
+        return Bill.__table__
+    hot = select(*(Bill.__table__.c[name] for name in BILL_COLUMNS))
+    cold = [select(*(archive_tables(p)[0].c[name] for name in BILL_COLUMNS)) for p in periods]
+    return union_all(hot, *cold).subquery("all_bills")
+
+
+def items_source(periods: List[str]) -> FromClause:
+    if not periods:
+        return BillItem.__table__
+    hot = select(*(BillItem.__table__.c[name] for name in ITEM_COLUMNS))
+    cold = [select(*(archive_tables(p)[1].c[name] for name in ITEM_COLUMNS)) for p in periods]
+    return union_all(hot, *cold).subquery("all_bill_items")
+
+
+def day_range(start: date, end: date) -> Tuple[datetime, datetime]:
+    return datetime.combine(start, datetime.min.time()), datetime.combine(end + timedelta(days=1), datetime.min.time())
+
+
+async def _load_bills(db: AsyncSession, periods: List[str], bills: FromClause, where) -> List[Dict]:
+    query = select(bills).where(*where).order_by(bills.c.created_at.desc())
+    rows = [dict(row) for row in (await db.execute(query)).mappings()]
+    if not rows:
+        return []
+
+    items = items_source(periods)
+    by_bill = {row["id"]: row for row in rows}
+    for row in rows:
+        row["items"] = []
+    item_rows = await db.execute(
+        select(items).where(items.c.bill_id.in_(list(by_bill))).order_by(items.c.id)
+    )
+    for item in item_rows.mappings():
+        by_bill[item["bill_id"]]["items"].append(dict(item))
+    return rows
+
+
+async def fetch_bills(
+    db: AsyncSession,
+    start: Optional[date],
+    end: Optional[date],
+    created_by: Optional[int] = None
+) -> List[Dict]:
+    """Bills (with items) created in [start, end], newest first, across hot and archived months"""
+    start = start or date(1970, 1, 1)
+    end = end or date.today()
+    periods = list((await db.execute(archived_periods_query(start, end))).scalars())
+    bills = bills_source(periods)
+    range_start, range_end = day_range(start, end)
+    where = [bills.c.created_at >= range_start, bills.c.created_at < range_end]
+    if created_by is not None:
+        where.append(bills.c.created_by == created_by)
+    return await _load_bills(db, periods, bills, where)
+
+
+async def find_archived_bill(db: AsyncSession, bill_id: int) -> Optional[Dict]:
+    """Look up a bill that is no longer in the hot table"""
+    period = (await db.execute(
+        select(BillArchivePeriod.period).where(
+            BillArchivePeriod.min_bill_id <= bill_id, BillArchivePeriod.max_bill_id >= bill_id
+        )
+    )).scalars().first()
+    if period is None:
+        return None
+    bills, items = archive_tables(period)
+    # Query the archive pair directly; there is no need to touch the hot tables
+    row = (await db.execute(select(bills).where(bills.c.id == bill_id))).mappings().first()
+    if row is None:
+        return None
+    bill = dict(row)
+    item_rows = await db.execute(select(items).where(items.c.bill_id == bill_id).order_by(items.c.id))
+    bill["items"] = [dict(item) for item in item_rows.mappings()]
+    return bill
+
+
+def bill_count_query():
+    """Bills ever created (hot + archived); used to number new bills"""
+    archived = select(func.coalesce(func.sum(BillArchivePeriod.bill_count), 0)).scalar_subquery()
+    hot = select(func.count(Bill.id)).scalar_subquery()
+    return select(hot + archived)
+
+
+# ---------------------------------------------------------------------------
+# Archival
+# ---------------------------------------------------------------------------
+
+def archivable_periods(db: Session, keep_months: int, today: Optional[date] = None) -> List[str]:
+    """
+    Months with hot bills that ended more than `keep_months` months ago.
+    The month holding the newest bill is never archived: SQLite reuses the
+    highest rowid once it is deleted, which would clash with archived ids.
+    """
+    today = today or date.today()
+    month_index = today.year * 12 + today.month - 1 - keep_months
+    cutoff = datetime(month_index // 12, month_index % 12 + 1, 1)
+
+    newest = db.query(Bill.created_at).order_by(Bill.id.desc()).first()
+    oldest = db.query(func.min(Bill.created_at)).scalar()
+    if oldest is None or oldest >= cutoff:
+        return []
+
+    periods = []
+    year, month = oldest.year, oldest.month
+    while datetime(year, month, 1) < cutoff:
+        period = f"{year:04d}_{month:02d}"
+        start, end = period_bounds(period)
+        has_bills = db.query(Bill.id).filter(Bill.created_at >= start, Bill.created_at < end).first()
+        if has_bills and period != period_key(newest[0]):
+            periods.append(period)
+        year, month = year + month // 12, month % 12 + 1
+    return periods
+
+
+def archive_period(db: Session, period: str) -> Dict:
+    """Move one month of bills and their items into the archive tables, in one transaction"""
+    start, end = period_bounds(period)
+    bills, items = archive_tables(period)
+    connection = db.connection()
+
+    in_period = (Bill.created_at >= start, Bill.created_at < end)
+    bill_ids = select(Bill.id).where(*in_period)
+    stats = db.query(
+        func.count(Bill.id), func.coalesce(func.sum(Bill.total_amount), 0),
+        func.min(Bill.id), func.max(Bill.id)
+    ).filter(*in_period).one()
+    bill_count, total_amount, min_id, max_id = stats
+    if not bill_count:
+        return {"period": period, "bills": 0, "items": 0}
+    _archive_metadata.create_all(bind=connection, tables=[bills, items])
+
+    connection.execute(items.insert().from_select(
+        ITEM_COLUMNS,
+        select(*(BillItem.__table__.c[name] for name in ITEM_COLUMNS)).where(BillItem.bill_id.in_(bill_ids))
+    ))
+    connection.execute(bills.insert().from_select(
+        BILL_COLUMNS,
+        select(*(Bill.__table__.c[name] for name in BILL_COLUMNS)).where(*in_period)
+    ))
+    item_count = connection.execute(
+        BillItem.__table__.delete().where(BillItem.bill_id.in_(bill_ids))
+    ).rowcount
+    connection.execute(Bill.__table__.delete().where(*in_period))
+
+    # A period can be archived again if late bills were backdated into it
+    entry = db.get(BillArchivePeriod, period)
+    if entry is None:
+        entry = BillArchivePeriod(period=period, bill_count=0, item_count=0, total_amount=0)
+        db.add(entry)
+    entry.bill_count += bill_count
+    entry.item_count += item_count
+    entry.total_amount += total_amount
+    entry.min_bill_id = min(filter(None, (entry.min_bill_id, min_id)))
+    entry.max_bill_id = max(filter(None, (entry.max_bill_id, max_id)))
+    db.commit()
+    return {"period": period, "bills": bill_count, "items": item_count}
+
+
+def archive_closed_months(db: Session, keep_months: int, dry_run: bool = False) -> List[Dict]:
+    results = []
+    for period in archivable_periods(db, keep_months):
+        if dry_run:
+            start, end = period_bounds(period)
+            count = db.query(func.count(Bill.id)).filter(Bill.created_at >= start, Bill.created_at < end).scalar()
+            results.append({"period": period, "bills": count, "dry_run": True})
+            continue
+        try:
+            results.append(archive_period(db, period))
+        except Exception:
+            db.rollback()
+            raise
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive closed months of bills")
+    parser.add_argument("--keep-months", type=int, default=settings.BILL_ARCHIVE_KEEP_MONTHS,
+                        help="full months to keep in the hot tables besides the current one")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    import app.models  # noqa: F401  register every model before the schema check
+    from app.database import SessionLocal, engine
+    from app.schema import ensure_schema
+
+    ensure_schema(engine)
+    db = SessionLocal()
+    try:
+        for result in archive_closed_months(db, args.keep_months, args.dry_run):
+            print(result)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,5 +8,80 @@ class Settings:
     ALGORITHM = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./store.db")
+    # Async routes use the same database through an async driver (aiosqlite,
+    # asyncpg, ...); set this to override the URL derived from DATABASE_URL
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "")
+    # Optional read replica for reports, listings and read-only voice tools.
+    # A user's reads stay on the primary for STICKY seconds after they write,
+    # on every worker that is sent the X-Read-Primary-Until marker.
+    READ_REPLICA_URL = os.getenv("READ_REPLICA_URL", "")
+    READ_REPLICA_STICKY_SECONDS = float(os.getenv("READ_REPLICA_STICKY_SECONDS", "5"))
+    # Local testing: copy a SQLite primary onto a SQLite replica this often (0 = off)
+    READ_REPLICA_SQLITE_SYNC_SECONDS = float(os.getenv("READ_REPLICA_SQLITE_SYNC_SECONDS", "0"))
+    # Full months of bills kept in the hot tables by app.bill_archive
+    BILL_ARCHIVE_KEEP_MONTHS = int(os.getenv("BILL_ARCHIVE_KEEP_MONTHS", "3"))
+    # SQLite connection pragmas (applied to every new connection)
+    DB_SQLITE_WAL = os.getenv("DB_SQLITE_WAL", "true").lower() == "true"
+    DB_SQLITE_SYNCHRONOUS = os.getenv("DB_SQLITE_SYNCHRONOUS", "NORMAL")
+    DB_SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("DB_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    DB_SQLITE_MMAP_BYTES = int(os.getenv("DB_SQLITE_MMAP_BYTES", str(256 * 1024 * 1024)))
+    DB_SQLITE_CACHE_KB = int(os.getenv("DB_SQLITE_CACHE_KB", "65536"))
+    # Connection pool sizing
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Per-request SQL stats: Server-Timing header, N+1 warnings when one
+    # statement shape repeats THRESHOLD times, summary of the last WINDOW requests
+    SQL_STATS_ENABLED = os.getenv("SQL_STATS_ENABLED", "true").lower() == "true"
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+    SQL_STATS_WINDOW = int(os.getenv("SQL_STATS_WINDOW", "1000"))
+    # Request tracing: keep a sampled fraction of traces plus any slower than
+    # SLOW_MS (0 = off) in a ring buffer, and append them to JSONL_PATH if set
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+    TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "2000"))
+    TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", "200"))
+    TRACE_JSONL_PATH = os.getenv("TRACE_JSONL_PATH", "")
+    # Bearer token required to scrape /metrics (empty = open)
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+    # Answer simple voice commands locally instead of calling the LLM
+    VOICE_FAST_PATH = os.getenv("VOICE_FAST_PATH", "true").lower() == "true"
+    # Cache for answers produced by read-only voice tools. Entries are checked
+    # against the data_versions table, so writes on any worker invalidate
+    # them; writes that bypass the ORM (raw SQL, bulk loads) are only
+    # picked up when the TTL expires.
+    VOICE_CACHE_SIZE = int(os.getenv("VOICE_CACHE_SIZE", "256"))
+    VOICE_CACHE_TTL_SECONDS = float(os.getenv("VOICE_CACHE_TTL_SECONDS", "60"))
+    # Max products included in the voice system prompt
+    VOICE_CONTEXT_TOP_K = int(os.getenv("VOICE_CONTEXT_TOP_K", "15"))
+    # Threads used to run independent read-only voice tools concurrently
+    VOICE_TOOL_WORKERS = int(os.getenv("VOICE_TOOL_WORKERS", "4"))
+    # Max users returned by the get_all_users voice tool
+    VOICE_USER_LIST_LIMIT = int(os.getenv("VOICE_USER_LIST_LIMIT", "20"))
+    # Limits for in-memory voice sessions
+    VOICE_SESSION_MAX_COUNT = int(os.getenv("VOICE_SESSION_MAX_COUNT", "1000"))
+    VOICE_SESSION_MAX_BYTES = int(os.getenv("VOICE_SESSION_MAX_BYTES", str(50 * 1024 * 1024)))
+    VOICE_SESSION_TTL_HOURS = float(os.getenv("VOICE_SESSION_TTL_HOURS", "24"))
+    VOICE_SESSION_SWEEP_SECONDS = float(os.getenv("VOICE_SESSION_SWEEP_SECONDS", "300"))
+    # "memory" (per process) or "sqlite" (shared by all workers on the host)
+    VOICE_SESSION_BACKEND = os.getenv("VOICE_SESSION_BACKEND", "memory")
+    VOICE_SESSION_DB_PATH = os.getenv("VOICE_SESSION_DB_PATH", "./voice_sessions.db")
+    # Token budgets for conversation history and its rolling summary
+    VOICE_HISTORY_TOKEN_BUDGET = int(os.getenv("VOICE_HISTORY_TOKEN_BUDGET", "2000"))
+    VOICE_SUMMARY_TOKEN_BUDGET = int(os.getenv("VOICE_SUMMARY_TOKEN_BUDGET", "300"))
+    # OpenAI client deadlines, circuit breaker and hedging (0 disables hedging)
+    OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "15"))
+    OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "1"))
+    OPENAI_HEDGE_AFTER_MS = float(os.getenv("OPENAI_HEDGE_AFTER_MS", "0"))
+    LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+    LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+    # How long get_current_user may reuse a user row (0 disables the cache)
+    AUTH_USER_CACHE_TTL_SECONDS = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "30"))
+    # Verified JWTs kept so repeat requests skip signature checks (0 disables)
+    AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+    # Processes that run bcrypt (0 runs it on the request thread) and how many
+    # password operations may wait on them before requests get a 503
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "8"))
 
 settings = Settings()
\ No newline at end of file
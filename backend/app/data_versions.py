@@ -0,0 +1,91 @@
+"""
+Data Versions - Change counters per table
+
+Every ORM flush that touches a tracked table bumps that table's version, so
+caches can tag entries with the versions they were built from and detect
+staleness.
+
+Two counters are kept. The in-process one is free to read, but it only sees
+this worker's writes. The `data_versions` table is bumped in the same
+transaction as the write, so every worker sees it once the write commits;
+reading it costs one small query. Writes that bypass the ORM (raw SQL,
+benchmarks.generate_data) bump neither.
+"""
+import threading
+from typing import Dict, Iterable
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from app.models.data_version import DataVersion
+
+versions_table = DataVersion.__table__
+
+
+class DataVersions:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+
+    def get(self, table: str) -> int:
+        return self._versions.get(table, 0)
+
+    def snapshot(self, tables: Iterable[str]) -> Dict[str, int]:
+        return {table: self.get(table) for table in tables}
+
+    def bump(self, table: str):
+        with self._lock:
+            self._versions[table] = self._versions.get(table, 0) + 1
+
+    def read(self, db: Session, tables: Iterable[str]) -> Dict[str, int]:
+        """Committed versions from the database, as seen by every worker"""
+        tables = sorted(set(tables))
+        if not tables:
+            return {}
+        rows = dict(db.execute(
+            select(versions_table.c.table_name, versions_table.c.version)
+            .where(versions_table.c.table_name.in_(tables))
+        ).all())
+        return {table: rows.get(table, 0) for table in tables}
+
+
+# Global instance
+data_versions = DataVersions()
+
+
+def _bump_in_database(conn, tables):
+    rows = [{"table_name": table, "version": 1} for table in tables]
+    if conn.dialect.name in ("sqlite", "postgresql"):
+        if conn.dialect.name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        statement = insert(versions_table).values(rows)
+        conn.execute(statement.on_conflict_do_update(
+            index_elements=[versions_table.c.table_name],
+            set_={"version": versions_table.c.version + 1},
+        ))
+        return
+    updated = conn.execute(
+        update(versions_table)
+        .where(versions_table.c.table_name.in_(tables))
+        .values(version=versions_table.c.version + 1)
+    ).rowcount
+    if updated < len(tables):
+        existing = set(conn.execute(
+            select(versions_table.c.table_name).where(versions_table.c.table_name.in_(tables))
+        ).scalars())
+        conn.execute(versions_table.insert(), [row for row in rows if row["table_name"] not in existing])
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_flushed_tables(session, flush_context):
+    tables = {
+        getattr(obj, "__tablename__", None)
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+    } - {None, versions_table.name}
+    for table in tables:
+        data_versions.bump(table)
+    if tables:
+        # Sorted so concurrent writers lock the rows in the same order
+        _bump_in_database(session.connection(), sorted(tables))
@@ -1,16 +1,117 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import settings
 
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    if settings.DB_SQLITE_WAL:
+        # Readers no longer block the writer (and vice versa)
+        cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={settings.DB_SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.DB_SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.DB_SQLITE_MMAP_BYTES)}")
+    # Negative cache_size is in KiB rather than pages
+    cursor.execute(f"PRAGMA cache_size={-int(settings.DB_SQLITE_CACHE_KB)}")
+    cursor.close()
+
+
+def create_db_engine(url: str = None) -> Engine:
+    """
+    Build an engine from Settings. File-based SQLite gets a connection pool
+    (SQLAlchemy 1.4 defaults to opening a new connection per checkout) and
+    the DB_SQLITE_* pragmas on every new connection; server databases get
+    the DB_POOL_* sizing.
+    """
+    url = url or settings.DATABASE_URL
+
+    if not url.startswith("sqlite"):
+        return create_engine(
+            url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+
+    in_memory = url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+    options = {"connect_args": {"check_same_thread": False}}
+    if not in_memory:
+        options.update(
+            poolclass=QueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+        )
+    sqlite_engine = create_engine(url, **options)
+    event.listen(sqlite_engine, "connect", _apply_sqlite_pragmas)
+    return sqlite_engine
+
+
+# Async drivers for the sync URL schemes we support
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def async_database_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+")[0]
+    return ASYNC_DRIVERS.get(dialect, scheme) + sep + rest
+
+
+def create_async_db_engine(url: str = None) -> AsyncEngine:
+    """Async counterpart of create_db_engine for the same database"""
+    url = url or settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+
+    if not url.startswith("sqlite"):
+        return create_async_engine(
+            url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+
+    in_memory = url.endswith("://") or ":memory:" in url or "mode=memory" in url
+    options = {}
+    if not in_memory:
+        options.update(
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+        )
+    sqlite_engine = create_async_engine(url, **options)
+    event.listen(sqlite_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return sqlite_engine
+
+
 # Create engine
-engine = create_engine(
-    settings.DATABASE_URL, 
-    connect_args={"check_same_thread": False}
-)
+engine = create_db_engine()
+async_engine = create_async_db_engine()
+
+# Read replica engines; without READ_REPLICA_URL reads use the primary
+if settings.READ_REPLICA_URL:
+    replica_engine = create_db_engine(settings.READ_REPLICA_URL)
+    async_replica_engine = create_async_db_engine(async_database_url(settings.READ_REPLICA_URL))
+else:
+    replica_engine, async_replica_engine = engine, async_engine
 
 # Create session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Instances stay usable after commit; lazy loads are not possible under asyncio
+AsyncSessionLocal = sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+AsyncReadSessionLocal = sessionmaker(
+    bind=async_replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 # Create Base class
 Base = declarative_base()
@@ -21,4 +122,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Async dependency for `async def` routes
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,178 @@
+"""
+Read/Write Routing - Sends read-only queries to the read replica
+
+Reports, listings and read-only voice tools read from the replica when
+READ_REPLICA_URL is set. Everything else, and all writes, use the primary.
+The replica may lag behind, so each user who commits a write reads from the
+primary for the next READ_REPLICA_STICKY_SECONDS. That way they see their
+own writes, such as a bill they just created.
+
+The worker that handled the write remembers it. Its response also carries
+a signed X-Read-Primary-Until marker (user id, expiry, HMAC). Clients send
+the marker back, so any other worker keeps that user's reads on the
+primary as well.
+"""
+import hashlib
+import hmac
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.config import settings
+from app.database import AsyncReadSessionLocal, AsyncSessionLocal, ReadSessionLocal, SessionLocal
+from app.dependencies.auth import get_current_user, request_user_id
+from app.models.user import User
+
+
+class RecentWriters:
+    """Remembers which users committed a write in the last `sticky_seconds`"""
+
+    def __init__(self, sticky_seconds: float):
+        self.sticky_seconds = sticky_seconds
+        self._lock = threading.Lock()
+        self._last_write: Dict[int, float] = {}
+
+    def mark(self, user_id: int):
+        now = time.monotonic()
+        with self._lock:
+            self._last_write[user_id] = now
+            if len(self._last_write) > 10000:
+                cutoff = now - self.sticky_seconds
+                self._last_write = {uid: t for uid, t in self._last_write.items() if t >= cutoff}
+
+    def wrote_recently(self, user_id: Optional[int]) -> bool:
+        if user_id is None:
+            return False
+        with self._lock:
+            last = self._last_write.get(user_id)
+        return last is not None and time.monotonic() - last < self.sticky_seconds
+
+
+# Global instance
+recent_writers = RecentWriters(settings.READ_REPLICA_STICKY_SECONDS)
+
+STICKY_HEADER = "X-Read-Primary-Until"
+
+
+def _sign(payload: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), payload.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def sticky_marker(user_id: int) -> str:
+    payload = f"{user_id}.{int(time.time() + recent_writers.sticky_seconds)}"
+    return f"{payload}.{_sign(payload)}"
+
+
+def verify_sticky_marker(marker: Optional[str]) -> Optional[int]:
+    """The user id a valid, unexpired marker vouches for"""
+    try:
+        user_id, expires, signature = (marker or "").split(".")
+        if hmac.compare_digest(signature, _sign(f"{user_id}.{expires}")) and int(expires) > time.time():
+            return int(user_id)
+    except ValueError:
+        pass
+    return None
+
+
+class RequestWrites:
+    """Sticky state for one request: the user its marker vouches for and the user who wrote"""
+    __slots__ = ("sticky_user", "writer")
+
+    def __init__(self, sticky_user: Optional[int]):
+        self.sticky_user = sticky_user
+        self.writer: Optional[int] = None
+
+
+_request_writes: ContextVar[Optional[RequestWrites]] = ContextVar("request_writes", default=None)
+
+
+def pending_sticky_marker() -> Optional[str]:
+    """A marker for the current request's write, for responses whose headers are already sent"""
+    state = _request_writes.get()
+    return sticky_marker(state.writer) if state is not None and state.writer is not None else None
+
+
+@event.listens_for(Session, "after_flush")
+def _note_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_writer(session):
+    if session.info.pop("wrote", False):
+        user_id = request_user_id.get()
+        if user_id is not None:
+            recent_writers.mark(user_id)
+            state = _request_writes.get()
+            if state is not None:
+                state.writer = user_id
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_write(session):
+    session.info.pop("wrote", None)
+
+
+def replica_enabled() -> bool:
+    return bool(settings.READ_REPLICA_URL)
+
+
+def use_replica(user_id: Optional[int]) -> bool:
+    if not replica_enabled():
+        return False
+    state = _request_writes.get()
+    if state is not None and user_id is not None and state.sticky_user == user_id:
+        return False
+    return not recent_writers.wrote_recently(user_id)
+
+
+def read_session(user_id: Optional[int]) -> Session:
+    """A new sync session for reads on behalf of `user_id`"""
+    return ReadSessionLocal() if use_replica(user_id) else SessionLocal()
+
+
+# Dependency for read-only sync routes
+def get_read_db(current_user: User = Depends(get_current_user)):
+    db = read_session(current_user.id)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Dependency for read-only async routes
+async def get_async_read_db(current_user: User = Depends(get_current_user)):
+    factory = AsyncReadSessionLocal if use_replica(current_user.id) else AsyncSessionLocal
+    async with factory() as db:
+        yield db
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware that reads the sticky marker and returns a new one after a write"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not replica_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        state = RequestWrites(verify_sticky_marker(Headers(scope=scope).get(STICKY_HEADER)))
+        token = _request_writes.set(state)
+
+        async def send_with_marker(message):
+            if message["type"] == "http.response.start" and state.writer is not None:
+                MutableHeaders(scope=message).append(STICKY_HEADER, sticky_marker(state.writer))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_marker)
+        finally:
+            _request_writes.reset(token)
@@ -1,15 +1,24 @@
+from contextvars import ContextVar
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models.user import User
 from app.utils.security import verify_token
+from app.user_cache import user_cache
 
 security = HTTPBearer()
 
-def get_current_user(
+# The authenticated user's id for the current request (used by db_routing)
+request_user_id: ContextVar[Optional[int]] = ContextVar("request_user_id", default=None)
+
+# Async so authentication never takes a threadpool slot; sync routes can
+# still depend on it
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     token = credentials.credentials
     payload = verify_token(token)
@@ -27,17 +36,23 @@ def get_current_user(
             detail="Invalid authentication credentials"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = user_cache.get(user_id)
+    if user is None:
+        user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+        if user is not None:
+            user_cache.set(user)
+    
     if user is None or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found or inactive"
         )
     
+    request_user_id.set(user.id)
     return user
 
 def require_role(required_roles: list):
-    def role_checker(current_user: User = Depends(get_current_user)) -> User:
+    async def role_checker(current_user: User = Depends(get_current_user)) -> User:
         if current_user.role not in required_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -46,15 +61,15 @@ def require_role(required_roles: list):
         return current_user
     return role_checker
 
-def get_user_or_above(current_user: User = Depends(get_current_user)) -> User:
+async def get_user_or_above(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
-def get_admin_or_above(
+async def get_admin_or_above(
     current_user: User = Depends(require_role(["admin", "super_admin"]))
 ) -> User:
     return current_user
 
-def get_super_admin(
+async def get_super_admin(
     current_user: User = Depends(require_role(["super_admin"]))
 ) -> User:
     return current_user
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+Conversation History Budgeting - Token-aware trimming with a rolling summary
+
+Older turns that no longer fit the token budget are folded into a single
+summary message placed right after the system prompt, so prompt size stays
+bounded however long a session runs.
+"""
+from typing import Dict, List, Optional, Tuple
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    """Load the tokenizer on first use; tiktoken is optional and slow to import"""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:  # fall back to an estimate
+            _encoding = None
+        _encoding_loaded = True
+    return _encoding
+
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+# Per-message overhead the chat format adds (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+# Characters kept from each turn when it is folded into the summary
+SUMMARY_LINE_CHARS = 160
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # Roughly 4 characters per token for English text
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message: Dict) -> int:
+    return count_tokens(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS
+
+
+def is_summary(message: Dict) -> bool:
+    return message.get("role") == "system" and (message.get("content") or "").startswith(SUMMARY_PREFIX)
+
+
+def summarize(previous: Optional[Dict], dropped: List[Dict], budget: int) -> Dict:
+    """Fold dropped turns into the rolling summary, keeping the newest lines within budget"""
+    lines = []
+    if previous:
+        lines = previous["content"][len(SUMMARY_PREFIX):].strip().splitlines()
+
+    for message in dropped:
+        content = " ".join((message.get("content") or "").split())
+        if len(content) > SUMMARY_LINE_CHARS:
+            content = content[:SUMMARY_LINE_CHARS - 3] + "..."
+        lines.append(f"- {message['role']}: {content}")
+
+    while len(lines) > 1 and count_tokens("\n".join(lines)) > budget:
+        lines.pop(0)
+
+    return {"role": "system", "content": SUMMARY_PREFIX + "\n" + "\n".join(lines)}
+
+
+def compact_history(
+    conversation: List[Dict],
+    token_budget: int,
+    summary_budget: int,
+    max_messages: int
+) -> Tuple[List[Dict], Optional[Dict], int]:
+    """
+    Trim `conversation` (system prompt first) to fit the budgets.
+    Returns: (new_conversation, summary_message_or_None, turns_kept)
+    The summary is only returned when it changed.
+    """
+    system = conversation[0]
+    rest = conversation[1:]
+    summary = rest.pop(0) if rest and is_summary(rest[0]) else None
+
+    tokens = sum(message_tokens(message) for message in rest)
+    cut = 0
+    # Always keep the newest message, even if it alone exceeds the budget
+    while cut < len(rest) - 1 and (tokens > token_budget or len(rest) - cut > max_messages):
+        tokens -= message_tokens(rest[cut])
+        cut += 1
+
+    if not cut:
+        return conversation, None, len(rest)
+
+    summary = summarize(summary, rest[:cut], summary_budget)
+    kept = rest[cut:]
+    return [system, summary] + kept, summary, len(kept)
@@ -0,0 +1,164 @@
+"""
+LLM Resilience - Circuit breaker, hedged calls and latency tracking for the
+OpenAI client
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while the breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker. After `failure_threshold` consecutive
+    failures it opens for `reset_seconds`, then lets a single trial call
+    through (half-open); success closes it again, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """End a call that says nothing about provider health, e.g. one the provider rejected as invalid"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "times_opened": self.times_opened,
+                "rejected_calls": self.rejected,
+            }
+
+
+class LatencyRecorder:
+    """Keeps the most recent call latencies for percentile reporting"""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self.calls = 0
+        self.failures = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+
+    def record(self, seconds: float, ok: bool):
+        with self._lock:
+            self._samples.append(seconds)
+            self.calls += 1
+            if not ok:
+                self.failures += 1
+
+    def record_hedge(self, won: bool):
+        with self._lock:
+            self.hedges_fired += 1
+            if won:
+                self.hedges_won += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            ordered = sorted(self._samples)
+            stats = {
+                "calls": self.calls,
+                "failures": self.failures,
+                "hedges_fired": self.hedges_fired,
+                "hedges_won": self.hedges_won,
+            }
+        for name, pct in (("p50_ms", 50), ("p95_ms", 95), ("p99_ms", 99)):
+            stats[name] = round(ordered[int(pct / 100 * (len(ordered) - 1))] * 1000, 1) if ordered else None
+        return stats
+
+
+# Threads for hedged calls. Each caller may occupy two (primary + backup), so
+# the pool is sized from the request threadpool at startup; a smaller pool
+# would queue calls, and time spent queued counts toward hedge_after.
+DEFAULT_HEDGE_CALLERS = 40
+_hedge_lock = threading.Lock()
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+
+
+def size_hedge_pool(callers: int):
+    """Give each of `callers` concurrent callers room for a primary and a backup call"""
+    global _hedge_executor
+    with _hedge_lock:
+        previous = _hedge_executor
+        _hedge_executor = ThreadPoolExecutor(max_workers=2 * max(callers, 1), thread_name_prefix="llm-hedge")
+    if previous is not None:
+        previous.shutdown(wait=False)
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    if _hedge_executor is None:
+        size_hedge_pool(DEFAULT_HEDGE_CALLERS)
+    return _hedge_executor
+
+
+def call_with_hedge(fn: Callable[[], T], hedge_after: float, recorder: LatencyRecorder) -> T:
+    """
+    Run `fn`; if it has not finished after `hedge_after` seconds, start a
+    second identical call and return whichever finishes first successfully.
+    """
+    executor = _get_hedge_executor()
+    primary = executor.submit(fn)
+    done, _ = wait([primary], timeout=hedge_after)
+    if done:
+        return primary.result()
+
+    backup = executor.submit(fn)
+    pending = {primary, backup}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                recorder.record_hedge(won=future is backup)
+                return future.result()
+            error = future.exception()
+    recorder.record_hedge(won=False)
+    raise error
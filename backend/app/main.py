@@ -1,20 +1,49 @@
-from fastapi import FastAPI, Depends
+from contextlib import asynccontextmanager
+from anyio import to_thread
+from fastapi import FastAPI, Depends, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.database import engine, Base
-from app.routers import auth, product, bills, user, reports, voice
-
-Base.metadata.create_all(bind=engine)
+from app.database import engine
+from app.routers import auth, product, bills, user, reports, voice, diagnostics, metrics
+from app.session_manager import session_manager
+from app.config import settings
+from app.password_pool import password_pool, PasswordPoolBusy
+from app.replication import replicator
+from app.llm_resilience import size_hedge_pool
+from app.schema import ensure_schema
+from app.query_stats import QueryStatsMiddleware
+from app.metrics import MetricsMiddleware
+from app.tracing import TracingMiddleware
+from app.db_routing import ReadYourWritesMiddleware
 
 security = HTTPBearer()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup work lives here rather than at import so importing app.main
+    # (tests, tooling, worker boot) stays cheap
+    if ensure_schema(engine):
+        print("Database schema created or updated")
+    session_manager.start_sweeper(settings.VOICE_SESSION_SWEEP_SECONDS)
+    if replicator is not None:
+        replicator.start()
+    # Sync routes make the LLM calls, so hedging needs room for all of them
+    size_hedge_pool(to_thread.current_default_thread_limiter().total_tokens)
+    yield
+    session_manager.stop_sweeper()
+    password_pool.shutdown()
+    if replicator is not None:
+        replicator.stop()
+
 app = FastAPI(
     title="Store Management System API",
     description="API for managing store inventory, bills, and users",
     version="1.0.0",
     swagger_ui_init_oauth={
         "usePkceWithAuthorizationCodeGrant": True,
-    }
+    },
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -23,7 +52,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Query-Count", "Server-Timing", "X-Trace-Id", "X-Read-Primary-Until"],
 )
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
 
 app.include_router(auth.router)
 app.include_router(product.router)
@@ -31,6 +65,16 @@ app.include_router(bills.router)
 app.include_router(user.router)
 app.include_router(reports.router)
 app.include_router(voice.router)
+app.include_router(diagnostics.router)
+app.include_router(metrics.router)
+
+@app.exception_handler(PasswordPoolBusy)
+def password_pool_busy(request: Request, exc: PasswordPoolBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please try again"},
+        headers={"Retry-After": "1"}
+    )
 
 @app.get("/")
 def root():
@@ -0,0 +1,198 @@
+"""
+Metrics - Low-overhead counters, gauges and histograms in Prometheus format
+
+Each thread records into its own shard (a plain dict), so the hot path takes
+no lock: an increment is one dict update and an observation is a bisect plus
+two list updates. The shards are only summed when /metrics is scraped.
+When a thread exits (the AnyIO and executor pools retire idle threads), its
+shard is folded into a shared "retired" total so shards do not pile up.
+Values that already exist elsewhere (pool usage, cache hit counts) are read
+at scrape time by collector callbacks instead of being recorded per event.
+"""
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+# Collectors return (name, kind, help, [(labels, value), ...]) families
+Family = Tuple[str, str, str, List[Tuple[Labels, float]]]
+
+# Seconds; wide enough for both API requests and LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _ShardHolder:
+    """Lives in a thread-local; collected when its thread exits"""
+    __slots__ = ("shard", "__weakref__")
+
+    def __init__(self):
+        self.shard: Tuple[Dict, Dict] = ({}, {})
+
+
+class MetricsRegistry:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._descriptions: Dict[str, Tuple[str, str]] = {}
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+        self._local = threading.local()
+        self._shards_lock = threading.Lock()
+        self._shards: List[Tuple[Dict, Dict]] = []
+        self._retired: Tuple[Dict, Dict] = ({}, {})
+
+    def describe(self, name: str, kind: str, help_text: str):
+        """Declare a metric's type ("counter", "gauge" or "histogram") and HELP line"""
+        self._descriptions[name] = (kind, help_text)
+
+    def collector(self, fn: Callable[[], Iterable[Family]]):
+        """Register a callback that is asked for values at scrape time"""
+        self._collectors.append(fn)
+        return fn
+
+    def _shard(self) -> Tuple[Dict, Dict]:
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            holder = self._local.holder = _ShardHolder()
+            with self._shards_lock:
+                self._shards.append(holder.shard)
+            weakref.finalize(holder, self._retire, holder.shard)
+        return holder.shard
+
+    def _retire(self, shard: Tuple[Dict, Dict]):
+        """Move a finished thread's shard into the retired totals"""
+        with self._shards_lock:
+            self._shards = [s for s in self._shards if s is not shard]
+            self._add(self._retired, shard)
+
+    @staticmethod
+    def _add(total: Tuple[Dict, Dict], shard: Tuple[Dict, Dict]):
+        values, histograms = total
+        for key, value in dict(shard[0]).items():
+            values[key] = values.get(key, 0) + value
+        for key, series in dict(shard[1]).items():
+            series = list(series)
+            current = histograms.get(key)
+            histograms[key] = series if current is None else [a + b for a, b in zip(current, series)]
+
+    def inc(self, name: str, labels: Labels = (), amount: float = 1):
+        """Add to a counter, or to a gauge when `amount` may be negative"""
+        values = self._shard()[0]
+        key = (name, labels)
+        values[key] = values.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, labels: Labels = ()):
+        histograms = self._shard()[1]
+        key = (name, labels)
+        series = histograms.get(key)
+        if series is None:
+            # One slot per bucket plus +Inf, then sum
+            series = histograms[key] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def _merged(self) -> Tuple[Dict, Dict]:
+        merged: Tuple[Dict, Dict] = ({}, {})
+        with self._shards_lock:
+            shards = list(self._shards)
+            # Copied under the lock so a shard retired mid-scrape is not counted twice
+            self._add(merged, self._retired)
+        for shard in shards:
+            self._add(merged, shard)
+        return merged
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        values, histograms = self._merged()
+        families: Dict[str, List[str]] = {}
+
+        for (name, labels), value in sorted(values.items()):
+            families.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        for (name, labels), series in sorted(histograms.items()):
+            lines = families.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', repr(bound)),))} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(series[-1])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+
+        for collect in self._collectors:
+            try:
+                for name, kind, help_text, samples in collect():
+                    self._descriptions.setdefault(name, (kind, help_text))
+                    families.setdefault(name, []).extend(
+                        f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples
+                    )
+            except Exception as e:
+                print(f"Metrics collector error: {e}")
+
+        out = []
+        for name, lines in families.items():
+            kind, help_text = self._descriptions.get(name, ("untyped", ""))
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(lines)
+        return "\n".join(out) + "\n"
+
+
+# Global instance
+metrics = MetricsRegistry()
+
+metrics.describe("http_requests_total", "counter", "HTTP requests by route and status")
+metrics.describe("http_request_duration_seconds", "histogram", "HTTP request latency by route")
+metrics.describe("http_requests_in_flight", "gauge", "HTTP requests currently being handled")
+metrics.describe("bills_created_total", "counter", "Bills created, by source (api or voice)")
+metrics.describe("stock_units_decremented_total", "counter", "Product units taken out of stock by sales")
+metrics.describe("llm_request_duration_seconds", "histogram", "OpenAI chat completion latency, to the end of the stream for streamed calls")
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and in-flight count per route"""
+
+    def __init__(self, app, registry: MetricsRegistry = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = ["500"]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+
+        registry = self.registry
+        registry.inc("http_requests_in_flight")
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            registry.inc("http_requests_in_flight", amount=-1)
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            labels = (("method", scope["method"]), ("route", path))
+            registry.observe("http_request_duration_seconds", elapsed, labels)
+            registry.inc("http_requests_total", labels + (("status", status[0]),))
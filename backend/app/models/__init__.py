@@ -1,4 +1,6 @@
 from app.models.user import User
 from app.models.product import Product
 from app.models.bill import Bill
-from app.models.bill_item import BillItem
\ No newline at end of file
+from app.models.bill_item import BillItem
+from app.models.bill_archive import BillArchivePeriod
+from app.models.data_version import DataVersion
\ No newline at end of file
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+from datetime import datetime
+from app.database import Base
+
+class BillArchivePeriod(Base):
+    """One row per month whose bills were moved to bills_YYYY_MM / bill_items_YYYY_MM"""
+    __tablename__ = "bill_archive_periods"
+
+    period = Column(String, primary_key=True)  # "YYYY_MM"
+    bill_count = Column(Integer, nullable=False, default=0)
+    item_count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Float, nullable=False, default=0)
+    min_bill_id = Column(Integer)
+    max_bill_id = Column(Integer)
+    archived_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
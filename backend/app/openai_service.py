@@ -3,25 +3,141 @@ OpenAI Service with Function Calling Support
 """
 import os
 import json
-from typing import List, Dict, Optional, Tuple
-from openai import OpenAI
+import time
+from typing import Iterator, List, Dict, Optional, Tuple
+import threading
 from dotenv import load_dotenv
 
+from app.config import settings
+from app.metrics import metrics
+from app.tracing import span
+from app.llm_resilience import CircuitBreaker, CircuitOpenError, LatencyRecorder, call_with_hedge
+
 load_dotenv()
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY", "sk-mock-key"))
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Create the OpenAI client on first use. The SDK takes most of a second to
+    import, so workers that never serve a voice request never pay for it.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from openai import OpenAI
+                # OPENAI_BASE_URL can point at any OpenAI-compatible server, e.g.
+                # the local stand-in in benchmarks/mock_llm.py
+                _client = OpenAI(
+                    api_key=os.getenv("OPENAI_API_KEY", "sk-mock-key"),
+                    base_url=os.getenv("OPENAI_BASE_URL") or None,
+                    timeout=settings.OPENAI_TIMEOUT_SECONDS,
+                    max_retries=settings.OPENAI_MAX_RETRIES,
+                )
+    return _client
+
+breaker = CircuitBreaker(
+    failure_threshold=settings.LLM_BREAKER_FAILURES,
+    reset_seconds=settings.LLM_BREAKER_RESET_SECONDS
+)
+llm_latency = LatencyRecorder()
+
+LLM_UNAVAILABLE_MESSAGE = (
+    "The assistant is temporarily unavailable. "
+    "Simple requests like checking a price or stock still work."
+)
+
+
+def create_completion(**kwargs):
+    """
+    Call chat.completions.create behind the circuit breaker, with a per-call
+    deadline and, for non-streaming calls, an optional hedged second request.
+    """
+    with span("llm.chat_completion", model=kwargs.get("model"), stream=bool(kwargs.get("stream"))):
+        return _create_completion(**kwargs)
+
+
+def _create_completion(**kwargs):
+    if not breaker.allow():
+        raise CircuitOpenError("LLM circuit breaker is open")
+    
+    def call():
+        return get_client().chat.completions.create(timeout=settings.OPENAI_TIMEOUT_SECONDS, **kwargs)
+    
+    started = time.perf_counter()
+    try:
+        if settings.OPENAI_HEDGE_AFTER_MS > 0 and not kwargs.get("stream"):
+            response = call_with_hedge(call, settings.OPENAI_HEDGE_AFTER_MS / 1000, llm_latency)
+        else:
+            response = call()
+    except Exception as e:
+        _record_outcome(started, e)
+        raise
+    
+    if kwargs.get("stream"):
+        # Stalls and resets surface while the stream is read, so the outcome
+        # is recorded when it ends
+        return _watch_stream(response, started)
+    _record_outcome(started)
+    return response
+
+
+def _is_client_error(error: Exception) -> bool:
+    """A 4xx other than timeout/rate limit: our request was wrong, the provider is fine"""
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and 400 <= status < 500 and status not in (408, 429)
+
+
+def _record_outcome(started: float, error: Optional[Exception] = None):
+    elapsed = time.perf_counter() - started
+    if error is None:
+        breaker.record_success()
+        outcome = "ok"
+    elif _is_client_error(error):
+        breaker.release()
+        outcome = "client_error"
+    else:
+        breaker.record_failure()
+        outcome = "error"
+    llm_latency.record(elapsed, ok=error is None)
+    metrics.observe("llm_request_duration_seconds", elapsed, (("outcome", outcome),))
+
+
+def _watch_stream(stream, started: float) -> Iterator:
+    try:
+        yield from stream
+    except Exception as e:
+        _record_outcome(started, e)
+        raise
+    except GeneratorExit:
+        # The reader stopped early; that says nothing about the provider
+        breaker.release()
+        raise
+    finally:
+        # Releases the HTTP connection when the stream was not read to the end
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+    _record_outcome(started)
+
+
+def get_llm_stats() -> Dict:
+    return {"breaker": breaker.snapshot(), "latency": llm_latency.snapshot()}
 
 
 def get_ai_response_with_tools(
     messages: List[Dict],
     tools: List[Dict]
-) -> Tuple[Optional[str], Optional[Dict]]:
+) -> Tuple[Optional[str], List[Dict]]:
     """
     Get AI response with function calling support.
-    Returns: (text_response, tool_call) - one will be None
+    Returns: (text_response, tool_calls) - text is None when tools are called
     """
     try:
-        response = client.chat.completions.create(
+        response = create_completion(
             model="gpt-4o-mini",  # Use gpt-4o-mini for better function calling
             messages=messages,
             tools=tools,
@@ -32,21 +148,86 @@ def get_ai_response_with_tools(
         
         message = response.choices[0].message
         
-        # Check if the model wants to call a function
+        # Check if the model wants to call one or more functions
         if message.tool_calls:
-            tool_call = message.tool_calls[0]
-            return None, {
-                "id": tool_call.id,
-                "name": tool_call.function.name,
-                "arguments": json.loads(tool_call.function.arguments)
-            }
+            return None, [
+                {
+                    "id": tool_call.id,
+                    "name": tool_call.function.name,
+                    "arguments": json.loads(tool_call.function.arguments)
+                }
+                for tool_call in message.tool_calls
+            ]
         
         # Otherwise return the text response
-        return message.content, None
+        return message.content, []
     
+    except CircuitOpenError:
+        return LLM_UNAVAILABLE_MESSAGE, []
     except Exception as e:
         print(f"OpenAI API Error: {e}")
-        return f"I'm having trouble processing that request. Error: {str(e)}", None
+        return f"I'm having trouble processing that request. Error: {str(e)}", []
+
+
+def stream_ai_response_with_tools(
+    messages: List[Dict],
+    tools: List[Dict]
+) -> Iterator[Dict]:
+    """
+    Streaming variant of get_ai_response_with_tools.
+    Yields {"type": "token", "content": ...} events as text arrives, then
+    one {"type": "tool_call", ...} event per requested tool call.
+    """
+    try:
+        stream = create_completion(
+            model="gpt-4o-mini",
+            messages=messages,
+            tools=tools,
+            tool_choice="auto",
+            temperature=0.7,
+            max_tokens=300,
+            stream=True,
+        )
+
+        # Tool call arguments arrive in fragments keyed by index
+        tool_calls: Dict[int, Dict] = {}
+
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+
+            if delta.content:
+                yield {"type": "token", "content": delta.content}
+
+            for fragment in delta.tool_calls or []:
+                call = tool_calls.setdefault(
+                    fragment.index, {"id": None, "name": "", "arguments": ""}
+                )
+                if fragment.id:
+                    call["id"] = fragment.id
+                if fragment.function and fragment.function.name:
+                    call["name"] += fragment.function.name
+                if fragment.function and fragment.function.arguments:
+                    call["arguments"] += fragment.function.arguments
+
+        for index in sorted(tool_calls):
+            tool_call = tool_calls[index]
+            yield {
+                "type": "tool_call",
+                "id": tool_call["id"],
+                "name": tool_call["name"],
+                "arguments": json.loads(tool_call["arguments"] or "{}")
+            }
+
+    except CircuitOpenError:
+        yield {"type": "token", "content": LLM_UNAVAILABLE_MESSAGE}
+    except Exception as e:
+        print(f"OpenAI API Error (stream): {e}")
+        yield {
+            "type": "token",
+            "content": f"I'm having trouble processing that request. Error: {str(e)}"
+        }
 
 
 def get_final_response(
@@ -66,7 +247,7 @@ def get_final_response(
             "content": json.dumps(tool_result)
         })
         
-        response = client.chat.completions.create(
+        response = create_completion(
             model="gpt-4o-mini",
             messages=messages_with_result,
             temperature=0.7,
@@ -89,7 +270,7 @@ def get_ai_response(messages: List[Dict]) -> str:
     Legacy function for simple chat without function calling.
     """
     try:
-        response = client.chat.completions.create(
+        response = create_completion(
             model="gpt-4o-mini",
             messages=messages,
             temperature=0.7,
@@ -97,6 +278,8 @@ def get_ai_response(messages: List[Dict]) -> str:
         )
         return response.choices[0].message.content
     
+    except CircuitOpenError:
+        return LLM_UNAVAILABLE_MESSAGE
     except Exception as e:
         print(f"OpenAI API Error: {e}")
         return "I'm having trouble connecting right now. Please try again."
\ No newline at end of file
@@ -0,0 +1,143 @@
+"""
+Password Hashing Pool - Runs bcrypt in a bounded worker process pool
+
+A bcrypt call takes a few hundred milliseconds. Run on the request
+threadpool, a burst of logins takes every thread and stalls other
+endpoints. Hashing and verification go to a small process pool instead,
+and admission control caps how many requests can wait on it. Once the cap
+is reached callers get PasswordPoolBusy (HTTP 503) immediately instead of
+queueing.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Sequence, TypeVar
+
+import bcrypt
+
+from app.config import settings
+
+T = TypeVar("T")
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when too many password operations are already queued"""
+
+
+def bcrypt_hash(password: str) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+
+def bcrypt_check(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+
+class PasswordPool:
+    """
+    `workers` processes run bcrypt. At most `max_pending` calls (running +
+    queued) are admitted. With workers <= 0 the work runs inline
+    on the calling thread, as before.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max(max_pending, workers)
+        self._slots = threading.BoundedSemaphore(self.max_pending) if workers > 0 else None
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that is running threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def run(self, fn: Callable[..., T], *args) -> T:
+        return self.run_many(fn, [args])[0]
+
+    def run_many(self, fn: Callable[..., T], calls: Sequence[tuple]) -> List[T]:
+        """
+        Run `fn(*args)` for every args tuple. Each call holds its own pending
+        slot, and at most `workers` calls of a batch are queued at a time, so
+        a login admitted meanwhile waits behind a few hashes rather than the
+        whole batch. Raises PasswordPoolBusy only if no slot is free at the
+        start; later calls wait for a slot.
+        """
+        if self._slots is None:
+            return [fn(*args) for args in calls]
+        if not calls:
+            return []
+        if not self._acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordPoolBusy("Too many password operations in progress")
+
+        executor = self._get_executor()
+        results: List[T] = [None] * len(calls)
+        in_flight: Dict[Future, int] = {}
+        try:
+            for index, args in enumerate(calls):
+                # The first call's slot was taken above
+                if index:
+                    while len(in_flight) >= self.workers or not self._acquire(blocking=not in_flight):
+                        self._collect(in_flight, results)
+                in_flight[executor.submit(fn, *args)] = index
+            while in_flight:
+                self._collect(in_flight, results)
+        finally:
+            if in_flight:
+                wait(in_flight)
+                for _ in in_flight:
+                    self._release()
+        return results
+
+    def _acquire(self, blocking: bool) -> bool:
+        if not self._slots.acquire(blocking=blocking):
+            return False
+        with self._lock:
+            self.pending += 1
+        return True
+
+    def _release(self):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+        self._slots.release()
+
+    def _collect(self, in_flight: Dict[Future, int], results: List):
+        """Wait for at least one call to finish and free its slot"""
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            index = in_flight.pop(future)
+            self._release()
+            results[index] = future.result()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+# Global instance
+password_pool = PasswordPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -0,0 +1,140 @@
+"""
+Product Search Index - In-memory inverted index over product names/categories
+
+Used to pick the handful of products relevant to an utterance instead of
+sending the whole catalog to the LLM. The index is rebuilt lazily when the
+products table version changes (at most every MIN_REBUILD_SECONDS) or after
+REFRESH_SECONDS, to pick up writes made by other processes. Each build is
+published as one immutable snapshot, so readers never see a half-swapped
+index and never wait on a rebuild once the first one is done.
+"""
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.data_versions import data_versions
+from app.models.product import Product
+from app.voice_intents import build_name_lookup, normalize, singular
+
+
+LOW_STOCK_THRESHOLD = 10
+
+
+class IndexedProduct(NamedTuple):
+    id: int
+    name: str
+    quantity: int
+    selling_price: float
+    category: str
+
+
+def tokenize(text: str) -> List[str]:
+    return [singular(token) for token in normalize(text or "").replace(",", " ").split()]
+
+
+class IndexSnapshot(NamedTuple):
+    """One build of the index; never modified after it is published"""
+    products: Dict[int, IndexedProduct]
+    name_postings: Dict[str, Set[int]]
+    category_postings: Dict[str, Set[int]]
+    name_lookup: Dict[str, List[str]]
+    summary: Dict
+    version: int
+    built_at: float
+
+
+class ProductIndex:
+    REFRESH_SECONDS = 60
+    # Every sale bumps the products version; under checkout load rebuild at
+    # most this often instead of on every voice turn
+    MIN_REBUILD_SECONDS = 2
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[IndexSnapshot] = None
+
+    def _stale(self, snapshot: Optional[IndexSnapshot]) -> bool:
+        if snapshot is None:
+            return True
+        age = time.monotonic() - snapshot.built_at
+        if age >= self.REFRESH_SECONDS:
+            return True
+        return snapshot.version != data_versions.get("products") and age >= self.MIN_REBUILD_SECONDS
+
+    def _current(self, db: Session) -> IndexSnapshot:
+        """The newest snapshot, rebuilding it first if it is stale"""
+        snapshot = self._snapshot
+        if not self._stale(snapshot):
+            return snapshot
+        # One rebuild at a time; other callers keep using the current snapshot
+        if not self._lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            snapshot = self._snapshot
+            if self._stale(snapshot):
+                snapshot = self._snapshot = self._build(db)
+            return snapshot
+        finally:
+            self._lock.release()
+
+    def _build(self, db: Session) -> IndexSnapshot:
+        version = data_versions.get("products")
+        rows = db.query(
+            Product.id, Product.name, Product.quantity, Product.selling_price, Product.category
+        ).all()
+
+        products = {}
+        name_postings = defaultdict(set)
+        category_postings = defaultdict(set)
+        for row in rows:
+            product = IndexedProduct(row.id, row.name, row.quantity or 0, row.selling_price, row.category)
+            products[product.id] = product
+            for token in tokenize(product.name):
+                name_postings[token].add(product.id)
+            for token in tokenize(product.category):
+                category_postings[token].add(product.id)
+
+        summary = {
+            "product_count": len(products),
+            "total_units": sum(p.quantity for p in products.values()),
+            "low_stock_count": sum(1 for p in products.values() if p.quantity < LOW_STOCK_THRESHOLD),
+            "out_of_stock_count": sum(1 for p in products.values() if p.quantity <= 0),
+        }
+        name_lookup = build_name_lookup([p.name for p in products.values()])
+        return IndexSnapshot(
+            products, dict(name_postings), dict(category_postings), name_lookup, summary, version, time.monotonic()
+        )
+
+    def search(self, db: Session, query: str, limit: int) -> List[IndexedProduct]:
+        """Return up to `limit` products ranked by token overlap with `query`"""
+        snapshot = self._current(db)
+
+        scores: Dict[int, float] = defaultdict(float)
+        for token in set(tokenize(query)):
+            if len(token) < 2:
+                continue
+            for product_id in snapshot.name_postings.get(token, ()):
+                scores[product_id] += 2.0
+            for product_id in snapshot.category_postings.get(token, ()):
+                scores[product_id] += 1.0
+
+        ranked = sorted(scores, key=lambda pid: (-scores[pid], snapshot.products[pid].name))
+        return [snapshot.products[pid] for pid in ranked[:limit]]
+
+    def all_products(self, db: Session) -> List[IndexedProduct]:
+        return list(self._current(db).products.values())
+
+    def name_lookup(self, db: Session) -> Dict[str, List[str]]:
+        """Prebuilt name lookup for the voice fast path (see match_product_name)"""
+        return self._current(db).name_lookup
+
+    def summary(self, db: Session) -> Dict:
+        """Compact catalog aggregates for the prompt"""
+        return self._current(db).summary
+
+
+# Global instance
+product_index = ProductIndex()
@@ -0,0 +1,194 @@
+"""
+Query Stats - Per-request SQL counts, DB time and N+1 detection
+
+Cursor events on every engine count the statements run while a request is
+handled and the time spent in them. Each statement is reduced to a shape
+(whitespace and IN-lists collapsed). A shape that repeats
+SQL_N_PLUS_ONE_THRESHOLD or more times in one request is flagged as a
+likely N+1. Responses carry the totals in a Server-Timing header, and the
+last SQL_STATS_WINDOW requests are summarized at GET /api/diagnostics/queries.
+"""
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from app.config import settings
+
+# Bound parameters in the paramstyles of the drivers we use
+_PARAM = r"(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)"
+_IN_LIST = re.compile(rf"\(\s*{_PARAM}(?:\s*,\s*{_PARAM})+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """The statement with whitespace normalized and IN (?, ?, ...) reduced to IN (?)"""
+    return _IN_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class RequestQueries:
+    """Statements run while handling one request"""
+    __slots__ = ("count", "seconds", "shapes")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    queries = _current.get()
+    if queries is None or not conn.info.get("query_started"):
+        return
+    queries.seconds += time.perf_counter() - conn.info["query_started"].pop()
+    queries.count += 1
+    queries.shapes[statement_shape(statement)] += 1
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_timer(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+class QueryStatsRecorder:
+    """Rolling window of per-request query stats, grouped by route on read"""
+
+    def __init__(self, window: int, threshold: int):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=window)
+
+    def record(self, route: str, queries: RequestQueries) -> Dict[str, int]:
+        """Store one request and return its repeated statement shapes"""
+        repeated = queries.repeated(self.threshold)
+        with self._lock:
+            self._recent.append((route, queries.count, queries.seconds, repeated))
+        return repeated
+
+    def summary(self) -> Dict:
+        with self._lock:
+            recent = list(self._recent)
+
+        routes: Dict[str, Dict] = {}
+        for route, count, seconds, repeated in recent:
+            entry = routes.setdefault(route, {
+                "requests": 0, "queries": 0, "max_queries": 0,
+                "db_ms": 0.0, "max_db_ms": 0.0, "n_plus_one_requests": 0, "n_plus_one": {}
+            })
+            entry["requests"] += 1
+            entry["queries"] += count
+            entry["max_queries"] = max(entry["max_queries"], count)
+            entry["db_ms"] += seconds * 1000
+            entry["max_db_ms"] = max(entry["max_db_ms"], seconds * 1000)
+            if repeated:
+                entry["n_plus_one_requests"] += 1
+                for shape, n in repeated.items():
+                    entry["n_plus_one"][shape] = max(entry["n_plus_one"].get(shape, 0), n)
+
+        for entry in routes.values():
+            entry["avg_queries"] = round(entry.pop("queries") / entry["requests"], 2)
+            entry["avg_db_ms"] = round(entry.pop("db_ms") / entry["requests"], 2)
+            entry["max_db_ms"] = round(entry["max_db_ms"], 2)
+        return {
+            "window": len(recent),
+            "n_plus_one_threshold": self.threshold,
+            "routes": dict(sorted(routes.items(), key=lambda item: item[1]["avg_queries"], reverse=True)),
+        }
+
+    def reset(self):
+        with self._lock:
+            self._recent.clear()
+
+
+# Global instance
+query_stats = QueryStatsRecorder(settings.SQL_STATS_WINDOW, settings.SQL_N_PLUS_ONE_THRESHOLD)
+
+
+def route_name(scope) -> str:
+    route = scope.get("route")
+    return f"{scope['method']} {route.path}" if route is not None else f"{scope['method']} (unmatched)"
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware that scopes query stats to each HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.SQL_STATS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        token = _current.set(queries)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - started) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={queries.seconds * 1000:.2f};desc="{queries.count} queries", app;dur={total_ms:.2f}'
+                )
+                headers.append("X-Query-Count", str(queries.count))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            route = route_name(scope)
+            repeated = query_stats.record(route, queries)
+            for shape, n in repeated.items():
+                print(f"Possible N+1 in {route}: {n}x {shape[:200]}")
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, engine: Engine = None):
+    """
+    Fail if the block runs more than `max_queries` statements, e.g.
+
+        with assert_max_queries(3):
+            client.get("/api/bills", headers=auth)
+
+    Statements on every engine and thread are counted unless `engine` is
+    given. Yields the list of statements seen so far.
+    """
+    statements: List[str] = []
+    target = engine or Engine
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(target, "before_cursor_execute", count)
+    try:
+        yield statements
+    finally:
+        event.remove(target, "before_cursor_execute", count)
+    if len(statements) > max_queries:
+        listing = "\n".join(f"  {statement_shape(statement)}" for statement in statements)
+        raise AssertionError(f"{len(statements)} queries, expected at most {max_queries}:\n{listing}")
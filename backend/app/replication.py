@@ -0,0 +1,81 @@
+"""
+SQLite Replication Stand-in - Keeps a local replica file in sync for testing
+
+Production replicas are kept current by the database server. To exercise
+read/write routing locally, point DATABASE_URL and READ_REPLICA_URL at two
+SQLite files and set READ_REPLICA_SQLITE_SYNC_SECONDS. The primary is then
+copied onto the replica with SQLite's online backup API on that interval,
+which gives a replica that lags by up to one interval.
+"""
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy.engine import make_url
+
+from app.config import settings
+
+
+class SqliteReplicator:
+    def __init__(self, primary_path: str, replica_path: str, interval_seconds: float):
+        self.primary_path = primary_path
+        self.replica_path = replica_path
+        self.interval_seconds = interval_seconds
+        self.syncs = 0
+        self.last_sync: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def sync_once(self):
+        source = sqlite3.connect(self.primary_path)
+        target = sqlite3.connect(self.replica_path, timeout=30)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        self.syncs += 1
+        self.last_sync = time.time()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.sync_once()
+
+        def run():
+            while not self._stop.wait(self.interval_seconds):
+                try:
+                    self.sync_once()
+                except Exception as e:
+                    print(f"Replica sync error: {e}")
+
+        self._thread = threading.Thread(target=run, name="sqlite-replicator", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict:
+        return {
+            "syncs": self.syncs,
+            "lag_seconds": round(time.time() - self.last_sync, 3) if self.last_sync else None,
+        }
+
+
+def create_replicator() -> Optional[SqliteReplicator]:
+    """A replicator when both URLs are SQLite files and syncing is enabled"""
+    if settings.READ_REPLICA_SQLITE_SYNC_SECONDS <= 0 or not settings.READ_REPLICA_URL:
+        return None
+    primary, replica = make_url(settings.DATABASE_URL), make_url(settings.READ_REPLICA_URL)
+    if primary.get_backend_name() != "sqlite" or replica.get_backend_name() != "sqlite":
+        return None
+    return SqliteReplicator(primary.database, replica.database, settings.READ_REPLICA_SQLITE_SYNC_SECONDS)
+
+
+# Global instance
+replicator = create_replicator()
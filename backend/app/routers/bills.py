@@ -1,8 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
 from datetime import datetime, date
-from app.database import get_db
+from app.bill_archive import bill_count_query, fetch_bills, find_archived_bill
+from app.database import get_async_db
+from app.metrics import metrics
+from app.db_routing import get_async_read_db
 from app.models.bill import Bill
 from app.models.bill_item import BillItem
 from app.models.product import Product
@@ -12,18 +17,26 @@ from app.dependencies.auth import get_user_or_above, get_admin_or_above
 
 router = APIRouter(prefix="/api/bills", tags=["Bills"])
 
+# Items are loaded eagerly; lazy loading is not available on AsyncSession
+bills_with_items = select(Bill).options(selectinload(Bill.items))
+
 @router.post("", response_model=BillResponse, status_code=status.HTTP_201_CREATED)
-def create_bill(
+async def create_bill(
     bill_data: BillCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_user_or_above)
 ):
     # Validate products and check stock
     total_amount = 0
     bill_items_data = []
     
+    # One query for every product on the bill rather than one per item
+    product_ids = {item.product_id for item in bill_data.items}
+    result = await db.execute(select(Product).where(Product.id.in_(product_ids)))
+    products = {product.id: product for product in result.scalars()}
+    
     for item in bill_data.items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
+        product = products.get(item.product_id)
         if not product:
             raise HTTPException(
                 status_code=404,
@@ -47,7 +60,7 @@ def create_bill(
         })
     
     # Generate bill number
-    bill_count = db.query(Bill).count()
+    bill_count = await db.scalar(bill_count_query())
     bill_number = f"BILL{datetime.now().strftime('%Y%m%d')}{bill_count + 1:04d}"
     
     # Create bill
@@ -57,51 +70,62 @@ def create_bill(
         created_by=current_user.id
     )
     db.add(db_bill)
-    db.flush()  # Get the bill ID
     
     # Create bill items and update inventory
     for item_data in bill_items_data:
-        bill_item = BillItem(
-            bill_id=db_bill.id,
+        db_bill.items.append(BillItem(
             product_id=item_data["product"].id,
             product_name=item_data["product"].name,
             quantity=item_data["quantity"],
             price_per_unit=item_data["price_per_unit"],
             subtotal=item_data["subtotal"]
-        )
-        db.add(bill_item)
+        ))
         
         # Update product quantity
         item_data["product"].quantity -= item_data["quantity"]
     
-    db.commit()
-    db.refresh(db_bill)
+    # expire_on_commit is off, so the bill and its items serialize without a reload
+    await db.commit()
+    metrics.inc("bills_created_total", (("source", "api"),))
+    metrics.inc("stock_units_decremented_total", amount=sum(item.quantity for item in bill_data.items))
     return db_bill
 
 @router.get("/my-bills", response_model=List[BillResponse])
-def get_my_bills(
-    db: Session = Depends(get_db),
+async def get_my_bills(
+    start_date: Optional[date] = Query(None, description="Include archived months from this date"),
+    end_date: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_user_or_above)
 ):
     """Get bills created by the current user"""
-    bills = db.query(Bill).filter(Bill.created_by == current_user.id).order_by(Bill.created_at.desc()).all()
-    return bills
+    if start_date or end_date:
+        return await fetch_bills(db, start_date, end_date, created_by=current_user.id)
+    result = await db.execute(
+        bills_with_items.where(Bill.created_by == current_user.id).order_by(Bill.created_at.desc())
+    )
+    return result.scalars().all()
 
 @router.get("", response_model=List[BillResponse])
-def get_all_bills(
-    db: Session = Depends(get_db),
+async def get_all_bills(
+    start_date: Optional[date] = Query(None, description="Include archived months from this date"),
+    end_date: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_admin_or_above)
 ):
-    bills = db.query(Bill).order_by(Bill.created_at.desc()).all()
-    return bills
+    if start_date or end_date:
+        return await fetch_bills(db, start_date, end_date)
+    result = await db.execute(bills_with_items.order_by(Bill.created_at.desc()))
+    return result.scalars().all()
 
 @router.get("/{bill_id}", response_model=BillResponse)
-def get_bill(
+async def get_bill(
     bill_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_user_or_above)
 ):
-    bill = db.query(Bill).filter(Bill.id == bill_id).first()
+    bill = (await db.execute(bills_with_items.where(Bill.id == bill_id))).scalar_one_or_none()
+    if not bill:
+        bill = await find_archived_bill(db, bill_id)
     if not bill:
         raise HTTPException(status_code=404, detail="Bill not found")
-    return bill
\ No newline at end of file
+    return bill
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.models.user import User
+from app.query_stats import query_stats
+from app.tracing import tracer
+from app.dependencies.auth import get_admin_or_above
+
+router = APIRouter(prefix="/api/diagnostics", tags=["Diagnostics"])
+
+@router.get("/queries")
+async def get_query_stats(current_user: User = Depends(get_admin_or_above)):
+    """Query counts, DB time and likely N+1 statements per route over the recent window"""
+    return query_stats.summary()
+
+@router.delete("/queries", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_query_stats(current_user: User = Depends(get_admin_or_above)):
+    query_stats.reset()
+    return None
+
+@router.get("/traces")
+async def get_traces(
+    limit: int = Query(50, ge=1, le=500),
+    min_ms: float = Query(0, ge=0, description="Only traces at least this slow"),
+    current_user: User = Depends(get_admin_or_above)
+):
+    """Newest kept traces, summarized"""
+    return {"tracer": tracer.stats(), "traces": tracer.recent(limit, min_ms)}
+
+@router.get("/traces/{trace_id}")
+async def get_trace(trace_id: str, current_user: User = Depends(get_admin_or_above)):
+    """One trace with all of its spans"""
+    trace = tracer.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found (it may have rotated out)")
+    return trace
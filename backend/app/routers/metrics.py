@@ -0,0 +1,72 @@
+import hmac
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+from app.config import settings
+from app.database import async_engine, async_replica_engine, engine, replica_engine
+from app.metrics import metrics
+from app.password_pool import password_pool
+from app.token_cache import token_cache
+from app.user_cache import user_cache
+from app.voice_cache import voice_cache
+from app.voice_intents import fast_path_stats
+
+router = APIRouter(tags=["Metrics"])
+
+@metrics.collector
+def collect_db_pools():
+    """Connections checked out and idle in each engine's pool"""
+    engines = {"primary": engine, "primary_async": async_engine.sync_engine}
+    if replica_engine is not engine:
+        engines.update(replica=replica_engine, replica_async=async_replica_engine.sync_engine)
+    checked_out, idle, overflow = [], [], []
+    for name, db_engine in engines.items():
+        pool = db_engine.pool
+        # Only QueuePool-style pools report usage (not in-memory SQLite's)
+        if not hasattr(pool, "checkedout"):
+            continue
+        labels = (("engine", name),)
+        checked_out.append((labels, pool.checkedout()))
+        idle.append((labels, pool.checkedin()))
+        overflow.append((labels, max(pool.overflow(), 0)))
+    return [
+        ("db_pool_checked_out_connections", "gauge", "Connections currently lent out by the pool", checked_out),
+        ("db_pool_idle_connections", "gauge", "Connections waiting in the pool", idle),
+        ("db_pool_overflow_connections", "gauge", "Connections open beyond pool_size", overflow),
+    ]
+
+@metrics.collector
+def collect_caches():
+    stats = {
+        "auth_user": user_cache.stats(),
+        "auth_token": token_cache.stats(),
+        "voice_response": voice_cache.stats(),
+        "voice_fast_path": fast_path_stats.snapshot(),
+    }
+    hits = [((("cache", name),), s["hits"]) for name, s in stats.items()]
+    misses = [((("cache", name),), s["misses"]) for name, s in stats.items()]
+    ratios = [
+        ((("cache", name),), round(s["hits"] / (s["hits"] + s["misses"]), 4) if s["hits"] + s["misses"] else 0)
+        for name, s in stats.items()
+    ]
+    return [
+        ("cache_hits_total", "counter", "Cache hits", hits),
+        ("cache_misses_total", "counter", "Cache misses", misses),
+        ("cache_hit_ratio", "gauge", "Hits / (hits + misses) since start", ratios),
+    ]
+
+@metrics.collector
+def collect_password_pool():
+    stats = password_pool.stats()
+    return [
+        ("password_hash_pending", "gauge", "Password hashes queued or running", [((), stats["pending"])]),
+        ("password_hash_rejected_total", "counter", "Password operations refused with 503", [((), stats["rejected"])]),
+    ]
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics(request: Request):
+    """Prometheus scrape endpoint"""
+    if settings.METRICS_TOKEN:
+        supplied = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(supplied, f"Bearer {settings.METRICS_TOKEN}"):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
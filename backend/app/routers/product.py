@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.database import get_db
+from app.database import get_async_db
+from app.db_routing import get_async_read_db
 from app.models.product import Product
 from app.models.user import User
 from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse
@@ -9,66 +11,65 @@ from app.dependencies.auth import get_user_or_above
 
 router = APIRouter(prefix= "/api/products", tags= ["Products"])
 
+async def get_product_or_404(db: AsyncSession, product_id: int) -> Product:
+    product = await db.get(Product, product_id)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return product
+
 @router.get("", response_model= List[ProductResponse])
-def get_all_products(
-    db: Session = Depends(get_db),
+async def get_all_products(
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_user_or_above)
 ):
-    products = db.query(Product).all()
-    return products
+    result = await db.execute(select(Product))
+    return result.scalars().all()
 
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(
+async def get_product(
     product_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_user_or_above)
 ):
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    return await get_product_or_404(db, product_id)
 
 @router.post("", response_model= ProductResponse, status_code= status.HTTP_201_CREATED)
-def create_Product(
+async def create_Product(
     product: ProductCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_user_or_above)
 ):
     db_product = Product(**product.dict())
     db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
+    await db.commit()
+    await db.refresh(db_product)
     return db_product
 
 @router.put("/{product_id}", response_model=ProductResponse)
-def update_product(
+async def update_product(
     product_id: int,
     product_update: ProductUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_user_or_above)
 ):
-    db_product = db.query(Product).filter(Product.id == product_id).first()
-    if not db_product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    
+    db_product = await get_product_or_404(db, product_id)
+
     update_data = product_update.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_product, key, value)
-    
-    db.commit()
-    db.refresh(db_product)
+
+    await db.commit()
+    await db.refresh(db_product)
     return db_product
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_product(
+async def delete_product(
     product_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_user_or_above)
 ):
-    db_product = db.query(Product).filter(Product.id == product_id).first()
-    if not db_product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    
-    db.delete(db_product)
-    db.commit()
-    return None
\ No newline at end of file
+    db_product = await get_product_or_404(db, product_id)
+
+    await db.delete(db_product)
+    await db.commit()
+    return None
@@ -1,11 +1,10 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from datetime import datetime, date
 from typing import Optional
-from app.database import get_db
-from app.models.bill import Bill
-from app.models.bill_item import BillItem
+from app.db_routing import get_async_read_db
+from app.bill_archive import archived_periods_query, bills_source, items_source
 from app.models.product import Product
 from app.models.user import User
 from app.dependencies.auth import get_admin_or_above
@@ -13,9 +12,9 @@ from app.dependencies.auth import get_admin_or_above
 router = APIRouter(prefix="/api/reports", tags=["Reports"])
 
 @router.get("/sales/daily")
-def get_daily_sales(
+async def get_daily_sales(
     report_date: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_admin_or_above)
 ):
     # Parse date or use today
@@ -24,10 +23,20 @@ def get_daily_sales(
     else:
         target_date = date.today()
     
-    # Get bills for the date
-    bills = db.query(Bill).filter(
-        func.date(Bill.created_at) == target_date
-    ).all()
+    # Get bills for the date, from the archive if that month was archived
+    periods = list((await db.execute(archived_periods_query(target_date, target_date))).scalars())
+    bills_table = bills_source(periods)
+    result = await db.execute(
+        select(
+            bills_table.c.bill_number, bills_table.c.total_amount,
+            bills_table.c.created_at, User.full_name
+        ).outerjoin(
+            User, User.id == bills_table.c.created_by
+        ).filter(
+            func.date(bills_table.c.created_at) == target_date
+        )
+    )
+    bills = result.all()
     
     total_sales = sum(bill.total_amount for bill in bills)
     bill_count = len(bills)
@@ -37,7 +46,7 @@ def get_daily_sales(
             "bill_number": bill.bill_number,
             "total_amount": bill.total_amount,
             "created_at": bill.created_at,
-            "created_by": bill.creator.full_name
+            "created_by": bill.full_name
         }
         for bill in bills
     ]
@@ -50,9 +59,9 @@ def get_daily_sales(
     }
 
 @router.get("/profit/daily")
-def get_daily_profit(
+async def get_daily_profit(
     report_date: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user: User = Depends(get_admin_or_above)
 ):
     # Parse date or use today
@@ -62,19 +71,27 @@ def get_daily_profit(
         target_date = date.today()
     
     # Get bill items for the date with product info
-    bill_items = db.query(BillItem, Product).join(
-        Bill, BillItem.bill_id == Bill.id
-    ).join(
-        Product, BillItem.product_id == Product.id
-    ).filter(
-        func.date(Bill.created_at) == target_date
-    ).all()
+    periods = list((await db.execute(archived_periods_query(target_date, target_date))).scalars())
+    bills_table, items_table = bills_source(periods), items_source(periods)
+    result = await db.execute(
+        select(
+            items_table.c.product_name, items_table.c.quantity,
+            items_table.c.price_per_unit, Product.purchase_price
+        ).join(
+            bills_table, items_table.c.bill_id == bills_table.c.id
+        ).join(
+            Product, items_table.c.product_id == Product.id
+        ).filter(
+            func.date(bills_table.c.created_at) == target_date
+        )
+    )
+    bill_items = result.all()
     
     total_profit = 0
     product_breakdown = {}
     
-    for bill_item, product in bill_items:
-        profit = (bill_item.price_per_unit - product.purchase_price) * bill_item.quantity
+    for bill_item in bill_items:
+        profit = (bill_item.price_per_unit - bill_item.purchase_price) * bill_item.quantity
         total_profit += profit
         
         if bill_item.product_name not in product_breakdown:
@@ -1,22 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from collections import Counter
 from app.database import get_db
+from app.db_routing import get_read_db
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate, UserResponse
+from app.schemas.user import UserCreate, UserBulkCreate, UserUpdate, UserResponse, UserSummary
 from app.dependencies.auth import get_admin_or_above, get_super_admin
-from app.utils.security import get_password_hash
+from app.utils.security import get_password_hash, get_password_hashes
+from app.user_cache import user_cache
+from app.user_directory import search_users, summarize_users
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
 
 @router.get("", response_model=List[UserResponse])
 def get_all_users(
-    db: Session = Depends(get_db),
+    response: Response,
+    search: Optional[str] = Query(None, description="Match username, full name or email"),
+    role: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    cursor: Optional[int] = Query(None, description="X-Next-Cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Page size; omit for all users"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_admin_or_above)
 ):
-    users = db.query(User).all()
+    users, next_cursor = search_users(db, search, role, is_active, cursor, limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
     return users
 
+@router.get("/summary", response_model=UserSummary)
+def get_user_summary(
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_admin_or_above)
+):
+    return summarize_users(db)
+
 @router.post("", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def create_user(
     user_data: UserCreate,
@@ -48,8 +68,60 @@ def create_user(
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    # SQLite may reuse the id of a deleted user
+    user_cache.invalidate(db_user.id)
     return db_user
 
+@router.post("/bulk", response_model=List[UserResponse], status_code=status.HTTP_201_CREATED)
+def create_users_bulk(
+    bulk_data: UserBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_super_admin)
+):
+    """Create many users at once; the whole batch is rejected if any entry is invalid"""
+    users = bulk_data.users
+    usernames = [u.username for u in users]
+    emails = [u.email for u in users]
+
+    invalid_roles = sorted({u.role for u in users} - {"user", "admin", "super_admin"})
+    if invalid_roles:
+        raise HTTPException(status_code=400, detail=f"Invalid role: {', '.join(invalid_roles)}")
+
+    counts = Counter(usernames) + Counter(emails)
+    duplicates = sorted(value for value, count in counts.items() if count > 1)
+    if duplicates:
+        raise HTTPException(status_code=400, detail=f"Duplicated in request: {', '.join(duplicates)}")
+
+    # One query checks the whole batch against existing accounts
+    existing = db.query(User.username, User.email).filter(
+        or_(User.username.in_(usernames), User.email.in_(emails))
+    ).all()
+    if existing:
+        taken = set(usernames) & {row.username for row in existing}
+        taken |= set(emails) & {row.email for row in existing}
+        raise HTTPException(status_code=400, detail=f"Already exists: {', '.join(sorted(taken))}")
+
+    password_hashes = get_password_hashes([u.password for u in users])
+
+    db_users = [
+        User(
+            username=u.username,
+            password_hash=password_hash,
+            full_name=u.full_name,
+            email=u.email,
+            role=u.role
+        )
+        for u, password_hash in zip(users, password_hashes)
+    ]
+    db.add_all(db_users)
+    db.flush()
+    # Build the response before commit expires the instances
+    created = [UserResponse.from_orm(db_user) for db_user in db_users]
+    db.commit()
+    for db_user in created:
+        user_cache.invalidate(db_user.id)
+    return created
+
 @router.put("/{user_id}", response_model=UserResponse)
 def update_user(
     user_id: int,
@@ -80,6 +152,7 @@ def update_user(
     
     db.commit()
     db.refresh(db_user)
+    user_cache.invalidate(user_id)
     return db_user
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -97,4 +170,5 @@ def delete_user(
     
     db.delete(db_user)
     db.commit()
+    user_cache.invalidate(user_id)
     return None
\ No newline at end of file
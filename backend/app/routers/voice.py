@@ -1,18 +1,32 @@
 """
 Voice Assistant Router with Function Calling Support
 """
+import json
+import time
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
 from app.session_manager import session_manager
-from app.openai_service import get_ai_response_with_tools, get_final_response
-from app.voice_tools import VOICE_TOOLS, execute_tool
+from app.openai_service import (
+    get_ai_response_with_tools,
+    get_final_response,
+    get_llm_stats,
+    stream_ai_response_with_tools,
+)
+from app.voice_tools import VOICE_TOOLS, execute_tools
+from app.voice_intents import match_intent, fast_path_stats
+from app.voice_cache import cache_context, voice_cache
+from app.db_routing import pending_sticky_marker
+from app.product_index import product_index
+from app.config import settings
+from app.tracing import annotate, span, start_span
 from app.database import get_db
 from app.models.product import Product
 from app.models.user import User
-from app.dependencies.auth import get_user_or_above
+from app.dependencies.auth import get_user_or_above, get_admin_or_above
 
 router = APIRouter(prefix="/api/voice", tags=["Voice Assistant"])
 
@@ -34,20 +48,38 @@ class ResetRequest(BaseModel):
     session_id: str
 
 
-def get_store_context(db: Session) -> str:
-    """Get current store inventory for AI context"""
+def get_store_context(db: Session, query: str = "") -> str:
+    """
+    Get store inventory context for the AI.
+    Small catalogs are listed in full; larger ones only include the products
+    relevant to `query` plus catalog aggregates.
+    """
     try:
-        products = db.query(Product).all()
-        if not products:
+        summary = product_index.summary(db)
+        if not summary["product_count"]:
             return "The store currently has no products in inventory."
         
-        product_list = []
-        for p in products:
-            product_list.append(
-                f"- {p.name}: {p.quantity} in stock, sells for ${p.selling_price:.2f}"
+        top_k = settings.VOICE_CONTEXT_TOP_K
+        if summary["product_count"] <= top_k:
+            products = product_index.all_products(db)
+            header = "Current store inventory:"
+        else:
+            products = product_index.search(db, query, top_k)
+            header = (
+                f"The store has {summary['product_count']} products "
+                f"({summary['total_units']} units in stock, "
+                f"{summary['low_stock_count']} low on stock, "
+                f"{summary['out_of_stock_count']} out of stock). "
+                "Use the tools to look up any product not listed here."
             )
+            if products:
+                header += "\nProducts relevant to the current request:"
         
-        return "Current store inventory:\n" + "\n".join(product_list)
+        product_list = [
+            f"- {p.name}: {p.quantity} in stock, sells for ${p.selling_price:.2f}"
+            for p in products
+        ]
+        return "\n".join([header] + product_list)
     except Exception as e:
         return "Unable to fetch store inventory."
 
@@ -84,6 +116,79 @@ Confirm actions after they are completed.
 {store_context}"""
 
 
+def prepare_conversation(
+    session_id: str,
+    message: str,
+    db: Session,
+    current_user: User
+) -> List[Dict]:
+    """Refresh the system prompt and append the user message"""
+    # Refresh the system message with the products relevant to this message
+    store_context = get_store_context(db, message)
+    session_manager.set_system_prompt(session_id, get_system_prompt(store_context, current_user.role))
+    
+    # Add user message
+    session_manager.add_message(session_id, "user", message)
+    
+    # Get updated conversation
+    return session_manager.get_conversation(session_id)
+
+
+def run_tool_calls(
+    tool_calls: List[Dict],
+    db: Session,
+    current_user: User
+) -> Tuple[str, Optional[str], Optional[Dict], List[Dict]]:
+    """
+    Execute the tool calls from one turn.
+    Returns: (ai_response, action_performed, data, tool_results)
+    """
+    for tool_call in tool_calls:
+        print(f"🔧 Executing tool: {tool_call['name']} with args: {tool_call['arguments']}")
+    
+    tool_results = execute_tools(tool_calls, db, current_user)
+    
+    responses = []
+    actions = []
+    successful = []
+    for tool_call, tool_result in zip(tool_calls, tool_results):
+        print(f"📋 Tool result: {tool_result}")
+        
+        # Use the message from tool result directly for speed
+        if tool_result.get("success"):
+            responses.append(tool_result.get("message", "Done!"))
+            actions.append(tool_call["name"])
+            successful.append(tool_result)
+        else:
+            responses.append(tool_result.get("error", "Sorry, something went wrong."))
+    
+    if not successful:
+        data = None
+    elif len(tool_calls) == 1:
+        data = successful[0]
+    else:
+        data = {"results": successful}
+    
+    return " ".join(responses), ", ".join(actions) or None, data, tool_results
+
+
+def local_tool_call(message: str, db: Session) -> Optional[Dict]:
+    """Try the local intent parser before going to the LLM"""
+    if not settings.VOICE_FAST_PATH:
+        return None
+    
+    started = time.perf_counter()
+    tool_call = match_intent(message, db)
+    if tool_call:
+        fast_path_stats.record_hit(time.perf_counter() - started)
+    return tool_call
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format a single server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
 @router.post("/chat", response_model=ChatResponse)
 def chat(
     request: ChatRequest,
@@ -93,49 +198,45 @@ def chat(
     """Handle voice chat with function calling support"""
     
     try:
-        # Get conversation history
-        conversation = session_manager.get_conversation(request.session_id)
+        with span("voice.prepare_conversation"):
+            conversation = prepare_conversation(
+                request.session_id,
+                request.message,
+                db,
+                current_user
+            )
         
-        # If this is a new conversation, set up the system message
-        if len(conversation) == 1:  # Only system message exists
-            store_context = get_store_context(db)
-            conversation[0]["content"] = get_system_prompt(store_context, current_user.role)
+        # Simple commands skip the LLM entirely
+        text_response = None
+        local_call = local_tool_call(request.message, db)
+        tool_calls = [local_call] if local_call else []
         
-        # Add user message
-        session_manager.add_message(
-            request.session_id,
-            "user",
-            request.message
-        )
+        # Repeated read-only questions are answered from the cache, unless
+        # the answer depends on earlier turns
+        context = cache_context(conversation, local_call)
+        cached = voice_cache.get(request.message, current_user.role, context, db)
+        if cached:
+            annotate(voice_path="cache")
+            session_manager.add_message(request.session_id, "assistant", cached["response"])
+            return ChatResponse(**dict(cached, session_id=request.session_id))
         
-        # Get updated conversation
-        conversation = session_manager.get_conversation(request.session_id)
+        annotate(voice_path="fast_path" if local_call else "llm")
         
-        # Get AI response with tool support
-        text_response, tool_call = get_ai_response_with_tools(conversation, VOICE_TOOLS)
+        if not local_call:
+            # Get AI response with tool support
+            started = time.perf_counter()
+            text_response, tool_calls = get_ai_response_with_tools(conversation, VOICE_TOOLS)
+            fast_path_stats.record_miss(time.perf_counter() - started)
         
         action_performed = None
+        data = None
+        tool_results = []
+        tool_names = [tool_call["name"] for tool_call in tool_calls]
         
-        if tool_call:
-            # Execute the tool
-            print(f"🔧 Executing tool: {tool_call['name']} with args: {tool_call['arguments']}")
-            
-            tool_result = execute_tool(
-                tool_call["name"],
-                tool_call["arguments"],
-                db,
-                current_user
-            )
-            
-            print(f"📋 Tool result: {tool_result}")
-            
-            # Get a natural language response based on the tool result
-            if tool_result.get("success"):
-                action_performed = tool_call["name"]
-                # Use the message from tool result directly for speed
-                ai_response = tool_result.get("message", "Done!")
-            else:
-                ai_response = tool_result.get("error", "Sorry, something went wrong.")
+        if tool_calls:
+            versions = voice_cache.versions_for(tool_names, db)
+            with span("voice.run_tool_calls", tools=",".join(tool_names)):
+                ai_response, action_performed, data, tool_results = run_tool_calls(tool_calls, db, current_user)
         else:
             # No tool call, use the text response
             ai_response = text_response or "I'm not sure how to help with that."
@@ -147,12 +248,15 @@ def chat(
             ai_response
         )
         
-        return ChatResponse(
+        response = ChatResponse(
             response=ai_response,
             session_id=request.session_id,
             action_performed=action_performed,
-            data=tool_result if tool_result and tool_result.get("success") else None
+            data=data
         )
+        if tool_results and all(result.get("success") for result in tool_results):
+            voice_cache.put(request.message, current_user.role, context, tool_names, response.dict(), versions)
+        return response
     
     except Exception as e:
         print(f"Error in voice chat endpoint: {e}")
@@ -161,6 +265,139 @@ def chat(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/chat/stream")
+def chat_stream(
+    request: ChatRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_user_or_above)
+):
+    """
+    Streaming variant of /chat using server-sent events.
+    Emits `token` events as text is generated, `tool_call`/`tool_result`
+    events around tool execution, and a final `done` event carrying the
+    same payload as ChatResponse.
+    """
+    try:
+        with span("voice.prepare_conversation"):
+            conversation = prepare_conversation(
+                request.session_id,
+                request.message,
+                db,
+                current_user
+            )
+    except Exception as e:
+        print(f"Error in voice chat stream endpoint: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    def event_stream():
+        action_performed = None
+        data = None
+        tool_calls = []
+        tool_results = []
+        text_parts = []
+        
+        try:
+            local_call = local_tool_call(request.message, db)
+            context = cache_context(conversation, local_call)
+            cached = voice_cache.get(request.message, current_user.role, context, db)
+            if cached:
+                session_manager.add_message(request.session_id, "assistant", cached["response"])
+                yield sse_event("token", {"content": cached["response"]})
+                yield sse_event("done", dict(cached, session_id=request.session_id))
+                return
+            
+            if local_call:
+                events = iter([dict(local_call, type="tool_call")])
+            else:
+                events = stream_ai_response_with_tools(conversation, VOICE_TOOLS)
+            started = time.perf_counter()
+            # The loop yields, so it is timed without making it the current span
+            llm_span = start_span("voice.stream_response", voice_path="fast_path" if local_call else "llm")
+            
+            for event in events:
+                if event["type"] == "token":
+                    text_parts.append(event["content"])
+                    yield sse_event("token", {"content": event["content"]})
+                    continue
+                
+                # Announce tool calls as they arrive; they run together below
+                tool_calls.append(event)
+                yield sse_event("tool_call", {
+                    "name": event["name"],
+                    "arguments": event["arguments"]
+                })
+            
+            if llm_span is not None:
+                llm_span.finish()
+            if not local_call:
+                fast_path_stats.record_miss(time.perf_counter() - started)
+            
+            tool_names = [tool_call["name"] for tool_call in tool_calls]
+            if tool_calls:
+                versions = voice_cache.versions_for(tool_names, db)
+                with span("voice.run_tool_calls", tools=",".join(tool_names)):
+                    ai_response, action_performed, data, tool_results = run_tool_calls(tool_calls, db, current_user)
+                for tool_call, tool_result in zip(tool_calls, tool_results):
+                    yield sse_event("tool_result", {
+                        "name": tool_call["name"],
+                        "success": bool(tool_result.get("success"))
+                    })
+                yield sse_event("token", {"content": ai_response})
+            else:
+                ai_response = "".join(text_parts) or "I'm not sure how to help with that."
+            
+            session_manager.add_message(request.session_id, "assistant", ai_response)
+            
+            response = ChatResponse(
+                response=ai_response,
+                session_id=request.session_id,
+                action_performed=action_performed,
+                data=data
+            )
+            if tool_results and all(result.get("success") for result in tool_results):
+                voice_cache.put(request.message, current_user.role, context, tool_names, response.dict(), versions)
+            done = response.dict()
+            # Headers went out before the tools ran, so a write's sticky marker travels here
+            marker = pending_sticky_marker()
+            if marker:
+                done["read_primary_until"] = marker
+            yield sse_event("done", done)
+        
+        except Exception as e:
+            print(f"Error in voice chat stream: {e}")
+            yield sse_event("error", {"detail": str(e)})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/fast-path/stats")
+def get_fast_path_stats(current_user: User = Depends(get_admin_or_above)):
+    """Hit rate and estimated latency saved by the local intent parser"""
+    return fast_path_stats.snapshot()
+
+
+@router.get("/cache/stats")
+def get_cache_stats(current_user: User = Depends(get_admin_or_above)):
+    """Size and hit rate of the read-only voice response cache"""
+    return voice_cache.stats()
+
+
+@router.get("/llm/stats")
+def get_llm_client_stats(current_user: User = Depends(get_admin_or_above)):
+    """Circuit breaker state and latency of calls to the LLM provider"""
+    return get_llm_stats()
+
+
+@router.get("/sessions/stats")
+def get_session_stats(current_user: User = Depends(get_admin_or_above)):
+    """Session count, evictions and approximate memory used by voice sessions"""
+    return session_manager.metrics()
+
+
 @router.post("/reset-session")
 def reset_session(
     request: ResetRequest,
@@ -182,7 +419,8 @@ def get_history(
 ):
     """Get conversation history for a session"""
     try:
-        conversation = session_manager.get_conversation(session_id)
+        # Unknown sessions are reported as empty rather than created
+        conversation = session_manager.peek_conversation(session_id) or []
         # Exclude system message from history
         messages = [msg for msg in conversation if msg["role"] != "system"][-limit:]
         return {
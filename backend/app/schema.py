@@ -0,0 +1,51 @@
+"""
+Schema Check - Creates tables only when the models have changed
+
+create_all inspects every table on each call. Instead, a fingerprint of the
+model metadata is stored in a one-row-per-key `schema_meta` table. Startup
+then costs a single SELECT when the schema is already current.
+"""
+import hashlib
+
+from sqlalchemy import Column, MetaData, String, Table, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database import Base
+
+# Kept out of Base.metadata so it does not affect the fingerprint
+schema_meta = Table(
+    "schema_meta", MetaData(),
+    Column("key", String, primary_key=True),
+    Column("value", String, nullable=False),
+)
+
+
+def schema_fingerprint() -> str:
+    parts = []
+    for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        parts.append(table.name)
+        parts.extend(f"{column.name}:{column.type}:{column.nullable}" for column in table.columns)
+        parts.extend(sorted(index.name or "" for index in table.indexes))
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def ensure_schema(engine: Engine) -> bool:
+    """Create missing tables if the model fingerprint changed. Returns True if it ran."""
+    fingerprint = schema_fingerprint()
+    try:
+        with engine.connect() as conn:
+            stored = conn.execute(
+                select(schema_meta.c.value).where(schema_meta.c.key == "fingerprint")
+            ).scalar()
+        if stored == fingerprint:
+            return False
+    except SQLAlchemyError:
+        pass  # schema_meta does not exist yet
+
+    Base.metadata.create_all(bind=engine)
+    schema_meta.create(bind=engine, checkfirst=True)
+    with engine.begin() as conn:
+        conn.execute(schema_meta.delete().where(schema_meta.c.key == "fingerprint"))
+        conn.execute(schema_meta.insert().values(key="fingerprint", value=fingerprint))
+    return True
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Optional
 from datetime import datetime
 
 class UserBase(BaseModel):
@@ -11,6 +11,9 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
 
+class UserBulkCreate(BaseModel):
+    users: List[UserCreate] = Field(..., min_length=1, max_length=500)
+
 class UserUpdate(BaseModel):
     full_name: Optional[str] = None
     email: Optional[EmailStr] = None
@@ -24,4 +27,16 @@ class UserResponse(UserBase):
     created_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class RoleCount(BaseModel):
+    role: str
+    total: int
+    active: int
+    inactive: int
+
+class UserSummary(BaseModel):
+    total: int
+    active: int
+    inactive: int
+    by_role: List[RoleCount]
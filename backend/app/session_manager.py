@@ -1,71 +1,261 @@
-from typing import Dict, List
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
-class SessionManager:
-    def __init__(self):
-        # Store conversations: {session_id: [messages]}
-        self.sessions: Dict[str, List[Dict]] = {}
-        # Track when sessions were last accessed
-        self.last_accessed: Dict[str, datetime] = {}
-        
-    def get_conversation(self, session_id: str) -> List[Dict]:
-        if session_id not in self.sessions:
-            # Initialize new session with system message
-            self.sessions[session_id] = [
-                {
-                    "role": "system",
-                    "content": """You are a helpful Store Assistant for a retail management system. 
+from app.config import settings
+from app.session_store import SqliteSessionStore
+from app.history import compact_history
+
+DEFAULT_SYSTEM_PROMPT = """You are a helpful Store Assistant for a retail management system.
                     You can help users with:
                     - Checking product stock and prices
                     - Information about recent bills and sales
                     - General store operations questions
                     Keep responses concise since they may be spoken aloud."""
-                }
-            ]
-        
-        # Update last accessed time
-        self.last_accessed[session_id] = datetime.now()
-        return self.sessions[session_id]
-    
+
+# Rough per-message overhead (dict + keys) on top of the content length
+MESSAGE_OVERHEAD_BYTES = 200
+
+
+def estimate_size(conversation: List[Dict]) -> int:
+    return sum(
+        len(message.get("content") or "") + MESSAGE_OVERHEAD_BYTES
+        for message in conversation
+    )
+
+
+class SessionManager:
+    """
+    In-memory conversation store bounded by session count, total bytes and
+    idle TTL. Least recently used sessions are evicted first.
+
+    With a `store`, the in-memory dicts act as a write-through cache over a
+    store shared by all workers; a cached session is reused only while its
+    revision matches the store's.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1000,
+        max_bytes: int = 50 * 1024 * 1024,
+        ttl_hours: float = 24,
+        store: Optional[SqliteSessionStore] = None,
+        history_token_budget: int = 2000,
+        summary_token_budget: int = 300,
+        max_history_messages: int = 100,
+    ):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl_hours = ttl_hours
+        self.store = store
+        self.history_token_budget = history_token_budget
+        self.summary_token_budget = summary_token_budget
+        self.max_history_messages = max_history_messages
+        self._lock = threading.RLock()
+        # Store conversations: {session_id: [messages]}, oldest access first
+        self.sessions: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        # Track when sessions were last accessed
+        self.last_accessed: Dict[str, datetime] = {}
+        # Approximate memory footprint per session
+        self.sizes: Dict[str, int] = {}
+        self.total_bytes = 0
+        # Store revision each cached session was loaded at (store mode only)
+        self.revisions: Dict[str, int] = {}
+        self.evictions = {"lru": 0, "memory": 0, "ttl": 0}
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop_sweeper = threading.Event()
+
+    def get_conversation(self, session_id: str) -> List[Dict]:
+        with self._lock:
+            if self.store is not None:
+                self._sync(session_id)
+            elif session_id not in self.sessions:
+                # Initialize new session with system message
+                self.sessions[session_id] = [
+                    {"role": "system", "content": DEFAULT_SYSTEM_PROMPT}
+                ]
+                self._resize(session_id)
+
+            # Update last accessed time
+            self.sessions.move_to_end(session_id)
+            self.last_accessed[session_id] = datetime.now()
+            self._enforce_limits(keep=session_id)
+            return self.sessions[session_id]
+
+    def peek_conversation(self, session_id: str) -> Optional[List[Dict]]:
+        """Return a session's messages without creating or touching it"""
+        if self.store is not None:
+            loaded = self.store.load(session_id)
+            return loaded[1] if loaded else None
+        with self._lock:
+            conversation = self.sessions.get(session_id)
+            return list(conversation) if conversation is not None else None
+
+    def set_system_prompt(self, session_id: str, content: str):
+        with self._lock:
+            conversation = self.get_conversation(session_id)
+            conversation[0]["content"] = content
+            self._resize(session_id)
+            if self.store is not None:
+                self._record_write(session_id, self.store.set_system_prompt(session_id, content))
+            self._enforce_limits(keep=session_id)
+
     def add_message(self, session_id: str, role: str, content: str, tool_call: dict = None):
-        conversation = self.get_conversation(session_id)
-        message = {"role": role, "content": content}
-        
-        # Add tool call info if present (for OpenAI function calling)
-        if tool_call:
-            message["tool_calls"] = [{
-                "id": tool_call.get("id", "call_1"),
-                "type": "function",
-                "function": {
-                    "name": tool_call["name"],
-                    "arguments": str(tool_call["arguments"])
-                }
-            }]
-        
-        conversation.append(message)
-        
-        # Keep only last 20 messages to avoid token limits
-        # System message (index 0) + last 19 messages
-        if len(conversation) > 21:
-            self.sessions[session_id] = [conversation[0]] + conversation[-19:]
-    
+        with self._lock:
+            conversation = self.get_conversation(session_id)
+            message = {"role": role, "content": content}
+
+            # Add tool call info if present (for OpenAI function calling)
+            if tool_call:
+                message["tool_calls"] = [{
+                    "id": tool_call.get("id", "call_1"),
+                    "type": "function",
+                    "function": {
+                        "name": tool_call["name"],
+                        "arguments": str(tool_call["arguments"])
+                    }
+                }]
+
+            conversation.append(message)
+
+            # Fold older turns into a rolling summary once over the token budget
+            conversation, summary, keep_last = compact_history(
+                conversation,
+                self.history_token_budget,
+                self.summary_token_budget,
+                self.max_history_messages
+            )
+            self.sessions[session_id] = conversation
+
+            self._resize(session_id)
+            if self.store is not None:
+                revision = self.store.append(session_id, message, keep_last, summary)
+                self._record_write(session_id, revision)
+            self._enforce_limits(keep=session_id)
+
     def reset_session(self, session_id: str):
-        if session_id in self.sessions:
-            del self.sessions[session_id]
-        if session_id in self.last_accessed:
-            del self.last_accessed[session_id]
-    
-    def cleanup_old_sessions(self, max_age_hours: int = 24):
+        with self._lock:
+            self._drop_local(session_id)
+            if self.store is not None:
+                self.store.delete(session_id)
+
+    def cleanup_old_sessions(self, max_age_hours: Optional[float] = None):
+        if max_age_hours is None:
+            max_age_hours = self.ttl_hours
         cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
-        expired_sessions = [
-            sid for sid, last_time in self.last_accessed.items()
-            if last_time < cutoff_time
-        ]
-        
-        for session_id in expired_sessions:
-            self.reset_session(session_id)
-        
-        return len(expired_sessions)
+
+        with self._lock:
+            expired_sessions = [
+                sid for sid, last_time in self.last_accessed.items()
+                if last_time < cutoff_time
+            ]
+
+            for session_id in expired_sessions:
+                self._drop_local(session_id)
+            expired = len(expired_sessions)
+            if self.store is not None:
+                expired = self.store.delete_idle(cutoff_time.timestamp())
+            self.evictions["ttl"] += expired
+
+        return expired
+
+    def start_sweeper(self, interval_seconds: float):
+        """Run cleanup_old_sessions periodically on a daemon thread"""
+        if self._sweeper and self._sweeper.is_alive():
+            return
+        self._stop_sweeper.clear()
+
+        def sweep():
+            while not self._stop_sweeper.wait(interval_seconds):
+                try:
+                    self.cleanup_old_sessions()
+                except Exception as e:
+                    print(f"Session sweeper error: {e}")
+
+        self._sweeper = threading.Thread(target=sweep, name="session-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop_sweeper.set()
+        if self._sweeper:
+            self._sweeper.join(timeout=5)
+            self._sweeper = None
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": self.store.name if self.store is not None else "memory",
+                "stored_sessions": self.store.count() if self.store is not None else len(self.sessions),
+                "session_count": len(self.sessions),
+                "max_sessions": self.max_sessions,
+                "memory_bytes": self.total_bytes,
+                "max_memory_bytes": self.max_bytes,
+                "ttl_hours": self.ttl_hours,
+                "evictions": dict(self.evictions),
+                "sweeper_running": bool(self._sweeper and self._sweeper.is_alive()),
+            }
+
+    def _sync(self, session_id: str):
+        """Bring the cached copy in line with the store, creating the session if needed"""
+        revision = self.store.revision(session_id)
+        if revision is None:
+            revision = self.store.create(session_id, DEFAULT_SYSTEM_PROMPT)
+        if session_id in self.sessions and self.revisions.get(session_id) == revision:
+            return
+        self._load(session_id)
+
+    def _load(self, session_id: str):
+        loaded = self.store.load(session_id)
+        if loaded is None:
+            # Deleted by another worker; start over locally and resync next time
+            loaded = (-1, [{"role": "system", "content": DEFAULT_SYSTEM_PROMPT}])
+        self.revisions[session_id], self.sessions[session_id] = loaded
+        self._resize(session_id)
+
+    def _record_write(self, session_id: str, revision: int):
+        """Accept our own write, or reload if another worker wrote in between"""
+        if revision == self.revisions.get(session_id, -2) + 1:
+            self.revisions[session_id] = revision
+        else:
+            self._load(session_id)
+
+    def _drop_local(self, session_id: str):
+        self.sessions.pop(session_id, None)
+        self.last_accessed.pop(session_id, None)
+        self.revisions.pop(session_id, None)
+        self.total_bytes -= self.sizes.pop(session_id, 0)
+
+    def _resize(self, session_id: str):
+        size = estimate_size(self.sessions[session_id])
+        self.total_bytes += size - self.sizes.get(session_id, 0)
+        self.sizes[session_id] = size
+
+    def _enforce_limits(self, keep: Optional[str] = None):
+        """Evict least recently used sessions until within both caps"""
+        while len(self.sessions) > self.max_sessions or self.total_bytes > self.max_bytes:
+            oldest = next(iter(self.sessions))
+            if oldest == keep:
+                if len(self.sessions) == 1:
+                    break
+                self.sessions.move_to_end(oldest)
+                continue
+            reason = "lru" if len(self.sessions) > self.max_sessions else "memory"
+            # Only the local copy is evicted; the store keeps the session
+            self._drop_local(oldest)
+            self.evictions[reason] += 1
+
+def create_session_store() -> Optional[SqliteSessionStore]:
+    if settings.VOICE_SESSION_BACKEND == "sqlite":
+        return SqliteSessionStore(settings.VOICE_SESSION_DB_PATH)
+    return None
 
 # Global instance
-session_manager = SessionManager()
\ No newline at end of file
+session_manager = SessionManager(
+    max_sessions=settings.VOICE_SESSION_MAX_COUNT,
+    max_bytes=settings.VOICE_SESSION_MAX_BYTES,
+    ttl_hours=settings.VOICE_SESSION_TTL_HOURS,
+    store=create_session_store(),
+    history_token_budget=settings.VOICE_HISTORY_TOKEN_BUDGET,
+    summary_token_budget=settings.VOICE_SUMMARY_TOKEN_BUDGET,
+)
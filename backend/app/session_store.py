@@ -0,0 +1,174 @@
+"""
+Voice Session Stores - Persistence backends for SessionManager
+
+SessionManager keeps a local in-memory cache of conversations; a store makes
+them durable and shared between worker processes. Each session row carries a
+revision counter that is bumped on every change, so a worker can tell with a
+single primary-key lookup whether its cached copy is still current.
+"""
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+def dumps(message: Dict) -> str:
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+
+class SqliteSessionStore:
+    """
+    SQLite-backed session store shared by every worker on the host.
+    Messages are stored as append-only rows; only compaction deletes them.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS voice_sessions (
+                    id TEXT PRIMARY KEY,
+                    system_prompt TEXT NOT NULL,
+                    revision INTEGER NOT NULL DEFAULT 0,
+                    next_seq INTEGER NOT NULL DEFAULT 0,
+                    last_accessed REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS voice_messages (
+                    session_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    PRIMARY KEY (session_id, seq)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS ix_voice_sessions_last_accessed
+                    ON voice_sessions (last_accessed);
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, sql_steps: List[Tuple[str, tuple]], session_id: Optional[str] = None) -> int:
+        """
+        Run statements in one IMMEDIATE transaction. Returns the session's
+        revision as of the commit when `session_id` is given, otherwise the
+        rowcount of the last statement.
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = None
+            for sql, params in sql_steps:
+                cursor = conn.execute(sql, params)
+            if session_id is not None:
+                row = conn.execute(
+                    "SELECT revision FROM voice_sessions WHERE id = ?", (session_id,)
+                ).fetchone()
+                result = row[0] if row else -1
+            else:
+                result = cursor.rowcount if cursor is not None else 0
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def revision(self, session_id: str) -> Optional[int]:
+        row = self._connect().execute(
+            "SELECT revision FROM voice_sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def load(self, session_id: str) -> Optional[Tuple[int, List[Dict]]]:
+        """Return (revision, messages including the system message) or None"""
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT revision, system_prompt FROM voice_sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if not row:
+            return None
+        revision, system_prompt = row
+        messages = [{"role": "system", "content": system_prompt}]
+        messages.extend(
+            json.loads(payload) for (payload,) in conn.execute(
+                "SELECT payload FROM voice_messages WHERE session_id = ? ORDER BY seq",
+                (session_id,)
+            )
+        )
+        return revision, messages
+
+    def create(self, session_id: str, system_prompt: str) -> int:
+        return self._write([(
+            "INSERT OR IGNORE INTO voice_sessions (id, system_prompt, last_accessed) VALUES (?, ?, ?)",
+            (session_id, system_prompt, time.time())
+        )], session_id)
+
+    def set_system_prompt(self, session_id: str, content: str) -> int:
+        """Replace the system prompt and return the new revision"""
+        return self._write([(
+            "UPDATE voice_sessions SET system_prompt = ?, revision = revision + 1, last_accessed = ? "
+            "WHERE id = ?",
+            (content, time.time(), session_id)
+        )], session_id)
+
+    def append(self, session_id: str, message: Dict, keep_last: int, summary: Optional[Dict] = None) -> int:
+        """
+        Append a message and drop all but the newest `keep_last` turns. A new
+        rolling `summary` is stored in the slot just before the kept turns.
+        Returns the new revision.
+        """
+        steps = [
+            (
+                "INSERT INTO voice_messages (session_id, seq, payload) "
+                "SELECT id, next_seq, ? FROM voice_sessions WHERE id = ?",
+                (dumps(message), session_id)
+            ),
+            (
+                "UPDATE voice_sessions SET next_seq = next_seq + 1, revision = revision + 1, "
+                "last_accessed = ? WHERE id = ?",
+                (time.time(), session_id)
+            ),
+        ]
+        if summary is not None:
+            steps.extend([
+                (
+                    "DELETE FROM voice_messages WHERE session_id = ? AND seq < "
+                    "(SELECT next_seq FROM voice_sessions WHERE id = ?) - ?",
+                    (session_id, session_id, keep_last)
+                ),
+                (
+                    "INSERT INTO voice_messages (session_id, seq, payload) "
+                    "SELECT id, next_seq - ? - 1, ? FROM voice_sessions WHERE id = ?",
+                    (keep_last, dumps(summary), session_id)
+                ),
+            ])
+        return self._write(steps, session_id)
+
+    def delete(self, session_id: str):
+        self._write([
+            ("DELETE FROM voice_messages WHERE session_id = ?", (session_id,)),
+            ("DELETE FROM voice_sessions WHERE id = ?", (session_id,)),
+        ])
+
+    def delete_idle(self, cutoff_timestamp: float) -> int:
+        return self._write([
+            (
+                "DELETE FROM voice_messages WHERE session_id IN "
+                "(SELECT id FROM voice_sessions WHERE last_accessed < ?)",
+                (cutoff_timestamp,)
+            ),
+            ("DELETE FROM voice_sessions WHERE last_accessed < ?", (cutoff_timestamp,)),
+        ])
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM voice_sessions").fetchone()[0]
@@ -0,0 +1,84 @@
+"""
+Verified Token Cache - Skips repeat JWT verification on the hot path
+
+Each till sends the same bearer token with every request. A token that has
+passed signature verification once is stored under its SHA-256 digest,
+together with its decoded payload and `exp`. Repeat requests then cost one
+hash and a dict lookup instead of HMAC verification and JSON parsing.
+Entries stop being served once `exp` passes. The whole cache is cleared
+when the signing key or algorithm changes.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from app.config import settings
+
+
+class TokenCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._key_fingerprint = self._fingerprint()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _fingerprint() -> tuple:
+        return (settings.SECRET_KEY, settings.ALGORITHM)
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def _check_key(self):
+        """Drop everything verified with a key that is no longer current"""
+        fingerprint = self._fingerprint()
+        if fingerprint != self._key_fingerprint:
+            self._entries.clear()
+            self._key_fingerprint = fingerprint
+
+    def get(self, digest: bytes) -> Optional[Dict]:
+        """Return a copy of the cached payload, or None if absent or expired"""
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            self._check_key()
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, payload = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+        return dict(payload)
+
+    def set(self, digest: bytes, payload: Dict):
+        if self.max_entries <= 0:
+            return
+        expires_at = payload.get("exp")
+        with self._lock:
+            self._check_key()
+            self._entries[digest] = (expires_at, dict(payload))
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Global instance
+token_cache = TokenCache(max_entries=settings.AUTH_TOKEN_CACHE_SIZE)
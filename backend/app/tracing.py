@@ -0,0 +1,264 @@
+"""
+Request Tracing - Lightweight spans across routers, voice tools, SQL and the LLM
+
+Each HTTP request gets a root span. Code inside it opens child spans with
+`span("name", key=value)`. The current span is kept in a ContextVar, so
+children attach to the right parent through FastAPI's threadpool and the
+async SQLAlchemy greenlets. Work handed to a ThreadPoolExecutor needs a
+copy of the context: `executor.submit(contextvars.copy_context().run, fn, ...)`.
+Every SQL statement becomes a `db.query` span.
+
+A trace is kept when the request was sampled (TRACE_SAMPLE_RATE) or when it
+ran for at least TRACE_SLOW_MS. Kept traces go to an in-memory ring buffer,
+viewable at /api/diagnostics/traces. They are also appended to
+TRACE_JSONL_PATH, one trace per line, when that is set.
+"""
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from app.config import settings
+
+
+class Trace:
+    __slots__ = ("trace_id", "sampled", "started", "spans", "_ids")
+
+    def __init__(self, sampled: bool):
+        self.trace_id = os.urandom(8).hex()
+        self.sampled = sampled
+        self.started = time.time()
+        self.spans: List["Span"] = []
+        self._ids = itertools.count(1)
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "thread", "_start", "duration", "error")
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[int], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = next(trace._ids)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.thread = threading.current_thread().name
+        self._start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        trace.spans.append(self)
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._start
+
+    def to_dict(self, origin: float) -> Dict:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ms": round((self._start - origin) * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "thread": self.thread,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time a block as a child of the current span; a no-op outside a trace"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(parent.trace, name, parent.span_id, attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        child.finish()
+
+
+def annotate(**attributes):
+    """Add attributes to the current span, if there is one"""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+def start_span(name: str, **attributes) -> Optional[Span]:
+    """
+    A child span that does not become the current span; call .finish() on it.
+    For intervals that cross a `yield`, where a with-block's ContextVar reset
+    could run in a different context.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    return Span(parent.trace, name, parent.span_id, attributes)
+
+
+class Tracer:
+    """Decides which traces to keep and stores them"""
+
+    def __init__(self, sample_rate: float, slow_ms: float, buffer_size: int, jsonl_path: str = ""):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.jsonl_path = jsonl_path
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=buffer_size)
+        self.started = 0
+        self.kept = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.slow_ms > 0
+
+    @contextmanager
+    def trace(self, name: str, **attributes):
+        """Open a root span. The trace is built either way; whether it is kept is decided at the end."""
+        if not self.enabled:
+            yield None
+            return
+        trace = Trace(sampled=random.random() < self.sample_rate)
+        root = Span(trace, name, None, attributes)
+        token = _current_span.set(root)
+        self.started += 1
+        try:
+            yield root
+        except BaseException as e:
+            root.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            root.finish()
+            if trace.sampled or (self.slow_ms > 0 and root.duration * 1000 >= self.slow_ms):
+                self._keep(trace, root)
+
+    def _keep(self, trace: Trace, root: Span):
+        origin = root._start
+        record = {
+            "trace_id": trace.trace_id,
+            "name": root.name,
+            "started_at": trace.started,
+            "duration_ms": round(root.duration * 1000, 3),
+            "sampled": trace.sampled,
+            "error": root.error or next((s.error for s in trace.spans if s.error), None),
+            "spans": [s.to_dict(origin) for s in list(trace.spans)],
+        }
+        with self._lock:
+            self.kept += 1
+            self._recent.append(record)
+            if self.jsonl_path:
+                try:
+                    with open(self.jsonl_path, "a") as fh:
+                        fh.write(json.dumps(record, default=str) + "\n")
+                except OSError as e:
+                    print(f"Trace export error: {e}")
+
+    def recent(self, limit: int = 50, min_ms: float = 0) -> List[Dict]:
+        """Summaries of the newest kept traces"""
+        with self._lock:
+            records = list(self._recent)
+        summaries = [
+            {key: record[key] for key in ("trace_id", "name", "started_at", "duration_ms", "sampled", "error")}
+            | {"span_count": len(record["spans"])}
+            for record in reversed(records) if record["duration_ms"] >= min_ms
+        ]
+        return summaries[:limit]
+
+    def get(self, trace_id: str) -> Optional[Dict]:
+        with self._lock:
+            return next((record for record in self._recent if record["trace_id"] == trace_id), None)
+
+    def stats(self) -> Dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "slow_ms": self.slow_ms,
+            "traces_started": self.started,
+            "traces_kept": self.kept,
+            "buffered": len(self._recent),
+        }
+
+
+# Global instance
+tracer = Tracer(
+    sample_rate=settings.TRACE_SAMPLE_RATE,
+    slow_ms=settings.TRACE_SLOW_MS,
+    buffer_size=settings.TRACE_BUFFER_SIZE,
+    jsonl_path=settings.TRACE_JSONL_PATH,
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_span(conn, cursor, statement, parameters, context, executemany):
+    parent = _current_span.get()
+    if parent is not None:
+        conn.info.setdefault("trace_spans", []).append(
+            Span(parent.trace, "db.query", parent.span_id, {"statement": statement[:300]})
+        )
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _finish_query_span(conn, cursor, statement, parameters, context, executemany):
+    if _current_span.get() is not None and conn.info.get("trace_spans"):
+        conn.info["trace_spans"].pop().finish()
+
+
+@event.listens_for(Engine, "handle_error")
+def _fail_query_span(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("trace_spans"):
+        query_span = conn.info["trace_spans"].pop()
+        query_span.error = str(exception_context.original_exception)
+        query_span.finish()
+
+
+class TracingMiddleware:
+    """ASGI middleware opening the root span for each HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        with tracer.trace(f"{scope['method']} {scope['path']}", method=scope["method"]) as root:
+            async def send_with_trace_id(message):
+                if message["type"] == "http.response.start":
+                    root.set(status=message["status"])
+                    if root.trace.sampled:
+                        MutableHeaders(scope=message).append("X-Trace-Id", root.trace.trace_id)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace_id)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    root.name = f"{scope['method']} {route.path}"
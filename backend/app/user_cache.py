@@ -0,0 +1,71 @@
+"""
+Authenticated User Cache - Short-lived in-process cache for get_current_user
+
+Stores plain column values (not ORM instances, which are bound to the
+session that loaded them) keyed by user id. Password hashes are not kept.
+Lookups rebuild a detached User with its identity key set, so adding it to
+a session, or cascading to it from a new Bill, never INSERTs a second row. Routes that change a user must
+call user_cache.invalidate(user_id); the TTL bounds staleness for changes
+made by other processes.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config import settings
+from app.models.user import User
+
+CACHED_COLUMNS = ("id", "username", "full_name", "email", "role", "is_active", "created_at")
+
+
+class UserCache:
+    def __init__(self, ttl_seconds: float, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[User]:
+        """Return a detached User built from the cached row, or None"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            values = entry[1]
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    def set(self, user: User):
+        if self.ttl_seconds <= 0:
+            return
+        values = {column: getattr(user, column) for column in CACHED_COLUMNS}
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl_seconds, values)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Global instance
+user_cache = UserCache(ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS)
@@ -0,0 +1,72 @@
+"""
+User Directory Queries - Paginated search and role summary for staff accounts
+
+Shared by the users router and the voice tools so neither loads every user
+row. Pages are keyed on user id (a cursor is the last id of the previous
+page). Counts are computed by the database with GROUP BY role, is_active.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+
+
+def search_users(
+    db: Session,
+    search: Optional[str] = None,
+    role: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    cursor: Optional[int] = None,
+    limit: Optional[int] = None
+) -> Tuple[List[User], Optional[int]]:
+    """
+    Return users ordered by id, starting after `cursor`.
+    Returns: (users, next_cursor); next_cursor is None on the last page.
+    """
+    query = db.query(User)
+    if search:
+        pattern = f"%{search.strip()}%"
+        query = query.filter(or_(
+            User.username.ilike(pattern),
+            User.full_name.ilike(pattern),
+            User.email.ilike(pattern)
+        ))
+    if role:
+        query = query.filter(User.role == role)
+    if is_active is not None:
+        query = query.filter(User.is_active == is_active)
+    if cursor is not None:
+        query = query.filter(User.id > cursor)
+    query = query.order_by(User.id)
+
+    if limit is None:
+        return query.all(), None
+
+    # Fetch one extra row to learn whether another page exists
+    users = query.limit(limit + 1).all()
+    if len(users) > limit:
+        return users[:limit], users[limit - 1].id
+    return users, None
+
+
+def summarize_users(db: Session) -> Dict:
+    """Total/active/inactive counts overall and per role"""
+    rows = db.query(User.role, User.is_active, func.count(User.id)).group_by(
+        User.role, User.is_active
+    ).all()
+
+    by_role: Dict[str, Dict] = {}
+    for role, is_active, count in rows:
+        entry = by_role.setdefault(role, {"role": role, "total": 0, "active": 0, "inactive": 0})
+        entry["total"] += count
+        entry["active" if is_active else "inactive"] += count
+
+    roles = sorted(by_role.values(), key=lambda entry: entry["role"])
+    return {
+        "total": sum(entry["total"] for entry in roles),
+        "active": sum(entry["active"] for entry in roles),
+        "inactive": sum(entry["inactive"] for entry in roles),
+        "by_role": roles,
+    }
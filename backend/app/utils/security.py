@@ -1,19 +1,20 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import List, Optional
 import jwt
-import bcrypt
 from app.config import settings
+from app.token_cache import token_cache
+from app.password_pool import password_pool, bcrypt_check, bcrypt_hash
 
+# bcrypt runs in the password pool; may raise PasswordPoolBusy under burst
 def verify_password(plain_password: str, hash_password: str) -> bool:
-    return bcrypt.checkpw(
-        plain_password.encode('utf-8'),
-        hash_password.encode('utf-8')
-    )
+    return password_pool.run(bcrypt_check, plain_password, hash_password)
 
 def get_password_hash(password: str) -> str:
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    return password_pool.run(bcrypt_hash, password)
+
+def get_password_hashes(passwords: List[str]) -> List[str]:
+    """Hash a batch of passwords in parallel across the pool's workers"""
+    return password_pool.run_many(bcrypt_hash, [(password,) for password in passwords])
 
 def get_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -28,16 +29,18 @@ def get_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encode_jwt
 
 def verify_token(token: str):
+    digest = token_cache.digest(token)
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return payload
     try:
         # FIX: Change from algorithm=[settings.ALGORITHM] to algorithms=[settings.ALGORITHM]
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except jwt.ExpiredSignatureError:
-        print("Token Expired")
-        return None  # FIX: Added explicit return
-    except jwt.InvalidTokenError as e:
-        print(f"Invalid Token: {e}")
+    except jwt.InvalidTokenError:
+        # Expired or tampered tokens are routine; don't log on the request path
         return None
     except Exception as e:
         print(f"Token verification error: {e}")
-        return None
\ No newline at end of file
+        return None
+    token_cache.set(digest, payload)
+    return payload
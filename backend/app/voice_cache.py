@@ -0,0 +1,144 @@
+"""
+Voice Response Cache - LRU + TTL cache for read-only voice answers
+
+Entries are keyed on the normalized user message, the user's role, the
+current date and a context: the tool calls the message resolves to, or
+"first_turn" for a session's opening message. Answers to follow-ups such
+as "what's its price?" depend on the conversation, so callers pass no
+context for them and they are never cached. Entries remember the table
+versions they were computed from. Any product/bill/user write, on any
+worker, bumps those versions in the database and the entry is dropped on
+its next lookup.
+"""
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.data_versions import data_versions
+from app.history import is_summary
+
+
+# Tools whose results depend only on the tables listed
+READ_ONLY_TOOLS = {
+    "check_product_stock": ("products",),
+    "get_product_price": ("products",),
+    "list_all_products": ("products",),
+    "get_low_stock_products": ("products",),
+    "get_daily_sales": ("bills",),
+    "get_profit_loss_report": ("bills", "bill_items", "products"),
+    "get_all_users": ("users",),
+    "get_user_summary": ("users",),
+}
+
+
+def normalize_message(message: str) -> str:
+    text = re.sub(r"[^a-z0-9\s]", " ", message.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def cache_context(conversation: List[Dict], tool_call: Optional[Dict] = None) -> Optional[str]:
+    """
+    The cache key part standing in for the conversation: the tool call
+    resolved from the message alone, else "first_turn" when nothing but the
+    system prompt precedes the message, else None (not cacheable). A
+    compacted session's summary counts as history.
+    """
+    if tool_call:
+        return "tool:" + json.dumps([tool_call["name"], tool_call["arguments"]], sort_keys=True, default=str)
+    if first_turn(conversation):
+        return "first_turn"
+    return None
+
+
+def first_turn(conversation: List[Dict]) -> bool:
+    """True when the last message is the session's only non-system message"""
+    earlier = conversation[:-1]
+    return (
+        bool(conversation) and conversation[-1]["role"] == "user"
+        and all(message["role"] == "system" and not is_summary(message) for message in earlier)
+    )
+
+
+class VoiceResponseCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, Tuple[float, Dict[str, int], Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, message: str, role: str, context: str) -> Tuple:
+        return (normalize_message(message), role, date.today(), context)
+
+    def get(self, message: str, role: str, context: Optional[str], db: Session) -> Optional[Dict[str, Any]]:
+        if context is None:
+            return None
+        key = self._key(message, role, context)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, versions, response = entry
+            # Versions are read from the database so writes on other workers count
+            if expires_at > time.monotonic() and data_versions.read(db, versions) == versions:
+                with self._lock:
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                    self.hits += 1
+                return response
+            with self._lock:
+                self._entries.pop(key, None)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, message: str, role: str, context: Optional[str], tool_names: List[str],
+            response: Dict[str, Any], versions: Dict[str, int]):
+        """
+        Store a response produced only by read-only tools. `versions` must be
+        captured before the tools ran so a concurrent write invalidates it.
+        """
+        if context is None or not tool_names or self.max_entries <= 0:
+            return
+        if any(name not in READ_ONLY_TOOLS for name in tool_names):
+            return
+        key = self._key(message, role, context)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, versions, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def versions_for(self, tool_names: List[str], db: Session) -> Dict[str, int]:
+        tables = {table for name in tool_names for table in READ_ONLY_TOOLS.get(name, ())}
+        return data_versions.read(db, tables)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+# Global instance
+voice_cache = VoiceResponseCache(
+    max_entries=settings.VOICE_CACHE_SIZE,
+    ttl_seconds=settings.VOICE_CACHE_TTL_SECONDS
+)
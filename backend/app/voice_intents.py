@@ -0,0 +1,201 @@
+"""
+Local Intent Parser - Deterministic fast path for simple voice commands
+
+Handles "how many X do we have", "price of X" and "sell 2 X and 3 Y" without
+an LLM round trip. Anything it is not confident about falls back to OpenAI.
+"""
+import re
+import threading
+import difflib
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11,
+    "twelve": 12, "dozen": 12,
+}
+
+STOCK_PATTERNS = [
+    re.compile(r"^how (?:many|much) (?P<name>.+?) (?:do we have|do i have|are there|is there|are left|is left|in stock)(?: left| in stock)?$"),
+    re.compile(r"^(?:check |what is the |what's the )?(?:stock|inventory) (?:of|for) (?P<name>.+)$"),
+]
+
+PRICE_PATTERNS = [
+    re.compile(r"^(?:what is |what's )?(?:the )?(?:price|cost) (?:of|for) (?P<name>.+)$"),
+    re.compile(r"^how much (?:is|are|does|do) (?:a |an |the )?(?P<name>.+?)(?: cost| costs)?$"),
+]
+
+SELL_PATTERN = re.compile(r"^(?:please )?(?:sell|bill|checkout|check out|ring up) (?P<items>.+)$")
+ITEM_PATTERN = re.compile(r"^(?P<qty>\d+|" + "|".join(NUMBER_WORDS) + r") (?P<name>.+)$")
+ITEM_SEPARATOR = re.compile(r"\s*(?:,|\band\b|\bplus\b|&)\s*")
+
+FUZZY_CUTOFF = 0.85
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    text = re.sub(r"[^a-z0-9\s&,']", " ", text.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def singular(name: str) -> str:
+    """Very small English singularizer used only for name matching"""
+    if name.endswith("ies") and len(name) > 4:
+        return name[:-3] + "y"
+    if name.endswith("es") and name[:-2].endswith(("s", "x", "ch", "sh")):
+        return name[:-2]
+    if name.endswith("s") and not name.endswith("ss"):
+        return name[:-1]
+    return name
+
+
+def build_name_lookup(product_names: List[str]) -> Dict[str, List[str]]:
+    """Map each normalized, singularized product name to the names sharing it"""
+    index: Dict[str, List[str]] = {}
+    for name in product_names:
+        index.setdefault(singular(normalize(name)), []).append(name)
+    return index
+
+
+def match_product_name(phrase: str, index: Dict[str, List[str]]) -> Optional[str]:
+    """
+    Resolve a spoken phrase to exactly one product name using a lookup from
+    build_name_lookup. Returns None when there is no match or the match is ambiguous.
+    """
+    phrase = normalize(re.sub(r"^(?:the|a|an|some)\s+", "", phrase.strip()))
+    if not phrase:
+        return None
+
+    key = singular(phrase)
+    if key in index:
+        return index[key][0] if len(index[key]) == 1 else None
+
+    # Unique whole-word substring match ("milk" -> "Fresh Milk")
+    partial = [
+        names[0] for norm, names in index.items()
+        if len(names) == 1 and re.search(rf"\b{re.escape(key)}\b", norm)
+    ]
+    if len(partial) == 1:
+        return partial[0]
+
+    close = difflib.get_close_matches(key, list(index), n=2, cutoff=FUZZY_CUTOFF)
+    if len(close) == 1 and len(index[close[0]]) == 1:
+        return index[close[0]][0]
+
+    return None
+
+
+def parse_quantity(token: str) -> int:
+    return int(token) if token.isdigit() else NUMBER_WORDS[token]
+
+
+def match_intent(message: str, db: Session) -> Optional[Dict]:
+    """
+    Try to turn a user message into a tool call without the LLM.
+    Returns a tool call dict ({"id", "name", "arguments"}) or None.
+    """
+    text = normalize(message).rstrip(" ?.!")
+    if not text:
+        return None
+
+    stock_name = _match_single(STOCK_PATTERNS, text)
+    price_name = _match_single(PRICE_PATTERNS, text) if not stock_name else None
+    sell_match = SELL_PATTERN.match(text) if not (stock_name or price_name) else None
+
+    if not (stock_name or price_name or sell_match):
+        return None
+
+    # Imported here because the product index reuses this module's normalizer
+    from app.product_index import product_index
+    name_lookup = product_index.name_lookup(db)
+
+    if stock_name or price_name:
+        product_name = match_product_name(stock_name or price_name, name_lookup)
+        if not product_name:
+            return None
+        return {
+            "id": "local_fast_path",
+            "name": "check_product_stock" if stock_name else "get_product_price",
+            "arguments": {"product_name": product_name}
+        }
+
+    items = []
+    for part in ITEM_SEPARATOR.split(sell_match.group("items")):
+        if not part:
+            continue
+        item_match = ITEM_PATTERN.match(part)
+        if not item_match:
+            return None
+        product_name = match_product_name(item_match.group("name"), name_lookup)
+        if not product_name:
+            return None
+        items.append({
+            "product_name": product_name,
+            "quantity": parse_quantity(item_match.group("qty"))
+        })
+
+    if not items:
+        return None
+
+    return {
+        "id": "local_fast_path",
+        "name": "create_bill",
+        "arguments": {"items": items}
+    }
+
+
+def _match_single(patterns: List[re.Pattern], text: str) -> Optional[str]:
+    for pattern in patterns:
+        match = pattern.match(text)
+        if match:
+            return match.group("name")
+    return None
+
+
+class FastPathStats:
+    """Thread-safe counters for fast-path hit rate and latency saved"""
+
+    # Exponential moving average weight for observed LLM latency
+    EWMA_ALPHA = 0.2
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.local_seconds = 0.0
+        self.llm_seconds_ewma: Optional[float] = None
+        self.seconds_saved = 0.0
+
+    def record_hit(self, elapsed: float):
+        with self._lock:
+            self.hits += 1
+            self.local_seconds += elapsed
+            if self.llm_seconds_ewma is not None:
+                self.seconds_saved += max(self.llm_seconds_ewma - elapsed, 0.0)
+
+    def record_miss(self, llm_elapsed: float):
+        with self._lock:
+            self.misses += 1
+            if self.llm_seconds_ewma is None:
+                self.llm_seconds_ewma = llm_elapsed
+            else:
+                self.llm_seconds_ewma += self.EWMA_ALPHA * (llm_elapsed - self.llm_seconds_ewma)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "avg_local_ms": round(self.local_seconds / self.hits * 1000, 3) if self.hits else 0.0,
+                "avg_llm_ms": round(self.llm_seconds_ewma * 1000, 1) if self.llm_seconds_ewma is not None else None,
+                "estimated_ms_saved": round(self.seconds_saved * 1000, 1),
+            }
+
+
+# Global instance
+fast_path_stats = FastPathStats()
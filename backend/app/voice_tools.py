@@ -1,15 +1,26 @@
 """
 Voice Assistant Tools - Functions that can be called by the AI assistant
 """
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
 
+from app.config import settings
+from app.bill_archive import archived_periods_query, bill_count_query, bills_source, items_source
+from app.db_routing import read_session, replica_enabled
+from app.metrics import metrics
+from app.tracing import span
+from app.voice_cache import READ_ONLY_TOOLS
 from app.models.product import Product
 from app.models.bill import Bill
 from app.models.bill_item import BillItem
 from app.models.user import User
 from app.utils.security import get_password_hash
+from app.user_cache import user_cache
+from app.user_directory import search_users, summarize_users
 
 
 # Define the tools/functions available to the AI
@@ -200,7 +211,28 @@ VOICE_TOOLS = [
         "type": "function",
         "function": {
             "name": "get_all_users",
-            "description": "Get a list of all users in the system. Requires admin or super_admin role.",
+            "description": "List users in the system, optionally filtered by a search term or role. Requires admin or super_admin role.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "search": {
+                        "type": "string",
+                        "description": "Part of a username, full name or email"
+                    },
+                    "role": {
+                        "type": "string",
+                        "description": "Only users with this role: user, admin, or super_admin"
+                    }
+                },
+                "required": []
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_user_summary",
+            "description": "Count users by role and active status. Use this for questions like how many cashiers or admins there are. Requires admin or super_admin role.",
             "parameters": {
                 "type": "object",
                 "properties": {},
@@ -285,6 +317,19 @@ def execute_tool(
 ) -> Dict[str, Any]:
     """Execute a tool and return the result"""
     
+    with span(f"tool.{tool_name}") as tool_span:
+        result = _dispatch_tool(tool_name, arguments, db, current_user)
+        if tool_span is not None:
+            tool_span.set(success=bool(result.get("success")))
+        return result
+
+
+def _dispatch_tool(
+    tool_name: str,
+    arguments: Dict[str, Any],
+    db: Session,
+    current_user: User
+) -> Dict[str, Any]:
     try:
         if tool_name == "create_bill":
             return execute_create_bill(arguments, db, current_user)
@@ -314,7 +359,10 @@ def execute_tool(
             return execute_profit_loss(arguments, db, current_user)
         
         elif tool_name == "get_all_users":
-            return execute_get_all_users(db, current_user)
+            return execute_get_all_users(arguments, db, current_user)
+        
+        elif tool_name == "get_user_summary":
+            return execute_user_summary(db, current_user)
         
         elif tool_name == "create_user":
             return execute_create_user(arguments, db, current_user)
@@ -329,6 +377,60 @@ def execute_tool(
         return {"success": False, "error": str(e)}
 
 
+# Shared pool for running independent read-only tools concurrently
+tool_executor = ThreadPoolExecutor(
+    max_workers=settings.VOICE_TOOL_WORKERS,
+    thread_name_prefix="voice-tool"
+)
+
+
+def _execute_read_only_tool(tool_call: Dict, user: User) -> Dict[str, Any]:
+    """
+    Run a read-only tool on its own session (sessions are not thread-safe),
+    on the read replica unless the user has just written
+    """
+    db = read_session(user.id)
+    try:
+        return execute_tool(tool_call["name"], tool_call["arguments"], db, user)
+    finally:
+        db.close()
+
+
+def execute_tools(
+    tool_calls: List[Dict],
+    db: Session,
+    current_user: User
+) -> List[Dict[str, Any]]:
+    """
+    Execute every tool call from one LLM turn and return results in order.
+    Consecutive read-only tools run concurrently; writes run one at a time on
+    `db` and act as barriers, so reads after a write see its effects.
+    """
+    if len(tool_calls) == 1:
+        tool_call = tool_calls[0]
+        if replica_enabled() and tool_call["name"] in READ_ONLY_TOOLS:
+            return [_execute_read_only_tool(tool_call, current_user)]
+        return [execute_tool(tool_call["name"], tool_call["arguments"], db, current_user)]
+    
+    results = []
+    pending_reads = []
+    
+    for tool_call in tool_calls:
+        if tool_call["name"] in READ_ONLY_TOOLS:
+            # Run in a copy of this context so the tool's spans join the request trace
+            pending_reads.append(tool_executor.submit(
+                contextvars.copy_context().run, _execute_read_only_tool, tool_call, current_user
+            ))
+            continue
+        
+        results.extend(future.result() for future in pending_reads)
+        pending_reads = []
+        results.append(execute_tool(tool_call["name"], tool_call["arguments"], db, current_user))
+    
+    results.extend(future.result() for future in pending_reads)
+    return results
+
+
 def execute_create_bill(args: Dict, db: Session, user: User) -> Dict:
     """Create a bill with the specified items"""
     items = args.get("items", [])
@@ -365,7 +467,7 @@ def execute_create_bill(args: Dict, db: Session, user: User) -> Dict:
         })
     
     # Generate bill number
-    bill_count = db.query(Bill).count()
+    bill_count = db.scalar(bill_count_query())
     bill_number = f"BILL{datetime.now().strftime('%Y%m%d')}{bill_count + 1:04d}"
     
     # Create the bill
@@ -398,6 +500,8 @@ def execute_create_bill(args: Dict, db: Session, user: User) -> Dict:
         )
     
     db.commit()
+    metrics.inc("bills_created_total", (("source", "voice"),))
+    metrics.inc("stock_units_decremented_total", amount=sum(item["quantity"] for item in bill_items_data))
     
     return {
         "success": True,
@@ -528,11 +632,13 @@ def execute_daily_sales(args: Dict, db: Session, user: User) -> Dict:
     else:
         target_date = datetime.now().date()
     
-    # Get bills for the target date
-    bills = db.query(Bill).filter(
-        Bill.created_at >= datetime.combine(target_date, datetime.min.time()),
-        Bill.created_at < datetime.combine(target_date, datetime.max.time())
-    ).all()
+    # Get bills for the target date, from the archive if that month was archived
+    periods = list(db.execute(archived_periods_query(target_date, target_date)).scalars())
+    bills_table = bills_source(periods)
+    bills = db.execute(select(bills_table.c.total_amount).filter(
+        bills_table.c.created_at >= datetime.combine(target_date, datetime.min.time()),
+        bills_table.c.created_at < datetime.combine(target_date, datetime.max.time())
+    )).all()
     
     total_sales = sum(bill.total_amount for bill in bills)
     
@@ -582,12 +688,15 @@ def execute_profit_loss(args: Dict, db: Session, user: User) -> Dict:
     else:
         end_date = datetime.now().date()
     
-    # Get bills in the date range
+    # Get bills in the date range, including archived months
     from datetime import timedelta
-    bills = db.query(Bill).filter(
-        Bill.created_at >= datetime.combine(start_date, datetime.min.time()),
-        Bill.created_at <= datetime.combine(end_date + timedelta(days=1), datetime.min.time())
-    ).all()
+    periods = list(db.execute(archived_periods_query(start_date, end_date)).scalars())
+    bills_table, items_table = bills_source(periods), items_source(periods)
+    in_range = (
+        bills_table.c.created_at >= datetime.combine(start_date, datetime.min.time()),
+        bills_table.c.created_at <= datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+    )
+    bills = db.execute(select(bills_table.c.id, bills_table.c.total_amount).filter(*in_range)).all()
     
     if not bills:
         date_range = f"on {start_date}" if start_date == end_date else f"from {start_date} to {end_date}"
@@ -599,20 +708,18 @@ def execute_profit_loss(args: Dict, db: Session, user: User) -> Dict:
             "message": f"No sales {date_range}. Revenue: $0, Cost: $0, Profit: $0"
         }
     
-    total_revenue = 0
-    total_cost = 0
+    total_revenue = sum(bill.total_amount for bill in bills)
     
-    for bill in bills:
-        total_revenue += bill.total_amount
-        
-        # Get bill items and calculate cost
-        bill_items = db.query(BillItem).filter(BillItem.bill_id == bill.id).all()
-        for item in bill_items:
-            # Get the product to find purchase price
-            product = db.query(Product).filter(Product.id == item.product_id).first()
-            if product:
-                cost = item.quantity * product.purchase_price
-                total_cost += cost
+    # Cost of every item sold in the range, priced at the product's purchase price
+    total_cost = db.execute(
+        select(func.coalesce(func.sum(items_table.c.quantity * Product.purchase_price), 0)).select_from(
+            items_table
+        ).join(
+            bills_table, items_table.c.bill_id == bills_table.c.id
+        ).join(
+            Product, items_table.c.product_id == Product.id
+        ).filter(*in_range)
+    ).scalar()
     
     profit = total_revenue - total_cost
     profit_margin = (profit / total_revenue * 100) if total_revenue > 0 else 0
@@ -632,15 +739,18 @@ def execute_profit_loss(args: Dict, db: Session, user: User) -> Dict:
     }
 
 
-def execute_get_all_users(db: Session, user: User) -> Dict:
-    """Get all users (admin/super_admin only)"""
+def execute_get_all_users(args: Dict, db: Session, user: User) -> Dict:
+    """List users (admin/super_admin only), at most VOICE_USER_LIST_LIMIT of them"""
     if user.role not in ["admin", "super_admin"]:
         return {"success": False, "error": "You don't have permission to view users. Admin access required."}
     
-    users = db.query(User).all()
+    search = args.get("search")
+    role = args.get("role")
+    limit = settings.VOICE_USER_LIST_LIMIT
+    users, next_cursor = search_users(db, search=search, role=role, limit=limit)
     
     if not users:
-        return {"success": True, "users": [], "message": "No users found in the system"}
+        return {"success": True, "users": [], "message": "No users found matching that" if search or role else "No users found in the system"}
     
     user_list = []
     for u in users:
@@ -651,23 +761,47 @@ def execute_get_all_users(db: Session, user: User) -> Dict:
             "is_active": u.is_active
         })
     
-    # Create a summary
-    active_count = sum(1 for u in users if u.is_active)
-    role_counts = {}
-    for u in users:
-        role_counts[u.role] = role_counts.get(u.role, 0) + 1
-    
-    role_summary = ", ".join([f"{count} {role}s" for role, count in role_counts.items()])
     user_names = ", ".join([u.username for u in users[:5]])
-    if len(users) > 5:
-        user_names += f" and {len(users) - 5} more"
+    if search or role:
+        # Counting the filtered set would need a second scan; report what was fetched
+        shown = f"{len(users)}{'+' if next_cursor else ''}"
+        return {
+            "success": True,
+            "users": user_list,
+            "has_more": next_cursor is not None,
+            "message": f"Found {shown} matching users: {user_names}" + (" and more" if len(users) > 5 else "")
+        }
+    
+    # Counts come from GROUP BY in the database, not from the listed rows
+    summary = summarize_users(db)
+    role_summary = ", ".join([f"{r['total']} {r['role']}s" for r in summary["by_role"]])
+    if summary["total"] > 5:
+        user_names += f" and {summary['total'] - 5} more"
     
     return {
         "success": True,
         "users": user_list,
-        "total_count": len(users),
-        "active_count": active_count,
-        "message": f"There are {len(users)} users: {role_summary}. Users: {user_names}"
+        "has_more": next_cursor is not None,
+        "total_count": summary["total"],
+        "active_count": summary["active"],
+        "message": f"There are {summary['total']} users: {role_summary}. Users: {user_names}"
+    }
+
+
+def execute_user_summary(db: Session, user: User) -> Dict:
+    """Count users by role and status (admin/super_admin only)"""
+    if user.role not in ["admin", "super_admin"]:
+        return {"success": False, "error": "You don't have permission to view users. Admin access required."}
+    
+    summary = summarize_users(db)
+    role_summary = ", ".join(
+        [f"{r['total']} {r['role']}s ({r['active']} active)" for r in summary["by_role"]]
+    )
+    return {
+        "success": True,
+        **summary,
+        "message": f"There are {summary['total']} users, {summary['active']} active: {role_summary}"
+                   if summary["total"] else "No users found in the system"
     }
 
 
@@ -706,6 +840,8 @@ def execute_create_user(args: Dict, db: Session, user: User) -> Dict:
     
     db.add(new_user)
     db.commit()
+    # SQLite may reuse the id of a deleted user
+    user_cache.invalidate(new_user.id)
     
     return {
         "success": True,
@@ -734,8 +870,10 @@ def execute_delete_user(args: Dict, db: Session, user: User) -> Dict:
         return {"success": False, "error": "You cannot delete your own account"}
     
     # Delete user
+    target_user_id = target_user.id
     db.delete(target_user)
     db.commit()
+    user_cache.invalidate(target_user_id)
     
     return {
         "success": True,
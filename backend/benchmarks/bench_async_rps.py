@@ -0,0 +1,121 @@
+"""
+Benchmark: requests per second for sync vs async routes at high concurrency
+
+Starts the API on a background uvicorn thread with a temporary database.
+A sync twin of GET /api/products (a plain `def` route using get_db, so it
+runs on the threadpool) is mounted next to the async route. Both are
+driven by --concurrency in-flight requests from an asyncio client for
+--seconds each. The client runs in its own process so it does not share
+the server's GIL. Reports requests per second and latency per path.
+
+Usage (from backend/):
+    python -m benchmarks.bench_async_rps [--concurrency 200] [--seconds 10] \\
+        [--products 50] [--json out.json]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from benchmarks.common import ServerThread, latency_summary
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=200, help="requests in flight")
+    parser.add_argument("--seconds", type=float, default=10, help="duration per path")
+    parser.add_argument("--products", type=int, default=50)
+    parser.add_argument("--json", help="write results to this file")
+    return parser.parse_args()
+
+
+async def drive(url: str, headers: dict, concurrency: int, seconds: float) -> dict:
+    import httpx
+
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get(url)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "latency": latency_summary(latencies),
+    }
+
+
+def run_drive(*args) -> dict:
+    return asyncio.run(drive(*args))
+
+
+def main():
+    args = parse_args()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+    # Import after the environment is set so settings pick it up
+    from fastapi import Depends
+    from sqlalchemy.orm import Session
+    from app.database import Base, SessionLocal, engine, get_db
+    from app.dependencies.auth import get_user_or_above
+    from app.main import app
+    from app.models.product import Product
+    from app.models.user import User
+    from app.schemas.product import ProductResponse
+    from app.utils.security import get_access_token
+
+    @app.get("/bench/products-sync", response_model=List[ProductResponse])
+    def get_all_products_sync(
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_user_or_above)
+    ):
+        return db.query(Product).all()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(username="bench", password_hash="x", full_name="Bench",
+                email="bench@example.com", role="user")
+    db.add(user)
+    for index in range(args.products):
+        db.add(Product(name=f"product {index}", quantity=100, purchase_price=1.0, selling_price=2.0))
+    db.commit()
+    headers = {"Authorization": f"Bearer {get_access_token({'user_id': user.id, 'role': user.role})}"}
+    db.close()
+
+    runs = []
+    spawn = multiprocessing.get_context("spawn")
+    with ServerThread(app) as api, ProcessPoolExecutor(1, mp_context=spawn) as client:
+        for label, path in (("sync", "/bench/products-sync"), ("async", "/api/products")):
+            result = client.submit(run_drive, api.url + path, headers, args.concurrency, args.seconds).result()
+            runs.append({"path": label, "endpoint": path, **result})
+
+    results = {"concurrency": args.concurrency, "seconds": args.seconds,
+               "products": args.products, "runs": runs}
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return 1 if any(run["errors"] for run in runs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
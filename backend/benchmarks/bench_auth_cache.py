@@ -0,0 +1,82 @@
+"""
+Benchmark: authenticated request throughput with and without the user cache
+
+Drives GET /api/products in-process with a valid token and reports requests
+per second and DB queries per request with AUTH_USER_CACHE_TTL_SECONDS off
+and on.
+
+Usage (from backend/):
+    python -m benchmarks.bench_auth_cache [--requests 2000] [--threads 4] [--products 20]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.database import Base, SessionLocal, engine
+from app.main import app
+from app.models.product import Product
+from app.models.user import User
+from app.user_cache import user_cache
+from app.utils.security import get_access_token
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--products", type=int, default=20)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(username="bench", password_hash="x", full_name="Bench", email="bench@example.com", role="user")
+    db.add(user)
+    for i in range(args.products):
+        db.add(Product(name=f"product {i}", quantity=10, purchase_price=1, selling_price=2))
+    db.commit()
+    headers = {"Authorization": f"Bearer {get_access_token({'user_id': user.id, 'role': user.role})}"}
+    db.close()
+
+    queries = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(*_):
+        queries[0] += 1
+
+    client = TestClient(app)
+    results = {}
+    for label, ttl in (("no_cache", 0), ("cached", 30)):
+        user_cache.ttl_seconds = ttl
+        user_cache.clear()
+        client.get("/api/products", headers=headers)  # warm up
+
+        queries[0] = 0
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            statuses = list(pool.map(
+                lambda _: client.get("/api/products", headers=headers).status_code,
+                range(args.requests)
+            ))
+        elapsed = time.perf_counter() - started
+        results[label] = {
+            "requests_per_s": round(args.requests / elapsed, 1),
+            "db_queries_per_request": round(queries[0] / args.requests, 2),
+            "errors": sum(1 for status in statuses if status != 200),
+        }
+
+    results["speedup"] = round(results["cached"]["requests_per_s"] / results["no_cache"]["requests_per_s"], 2)
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Benchmark: provisioning users one at a time vs POST /api/users/bulk
+
+Creates --users accounts in-process through the serial endpoint
+(POST /api/users, one call per user) and again through the bulk endpoint.
+Reports wall time and DB queries for each. Passwords are hashed on
+--hash-workers pool processes (default: one per core).
+
+Usage (from backend/):
+    python -m benchmarks.bench_bulk_users [--users 40] [--hash-workers N] [--json out.json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--hash-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--json", help="write results to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    os.environ["PASSWORD_HASH_WORKERS"] = str(args.hash_workers)
+    os.environ["PASSWORD_HASH_MAX_PENDING"] = str(max(args.hash_workers, 1) * 4)
+
+    # Import after the environment is set so settings pick it up
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from app.database import Base, SessionLocal, engine
+    from app.main import app
+    from app.models.user import User
+    from app.password_pool import password_pool
+    from app.utils.security import get_access_token, get_password_hash
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    admin = User(username="root", password_hash=get_password_hash("root"),
+                 full_name="Root", email="root@example.com", role="super_admin")
+    db.add(admin)
+    db.commit()
+    headers = {"Authorization": f"Bearer {get_access_token({'user_id': admin.id, 'role': admin.role})}"}
+    db.close()
+
+    query_count = [0]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_query(*_):
+        query_count[0] += 1
+
+    def new_users(prefix: str):
+        return [
+            {"username": f"{prefix}{i}", "password": f"secret-{i}", "full_name": f"Cashier {i}",
+             "email": f"{prefix}{i}@example.com", "role": "user"}
+            for i in range(args.users)
+        ]
+
+    client = TestClient(app)
+
+    def measure(label: str, create):
+        queries_before = query_count[0]
+        started = time.perf_counter()
+        create()
+        elapsed = time.perf_counter() - started
+        return {
+            "path": label,
+            "elapsed_s": round(elapsed, 3),
+            "ms_per_user": round(elapsed / args.users * 1000, 2),
+            "db_queries": query_count[0] - queries_before,
+        }
+
+    def serial():
+        for user in new_users("serial"):
+            assert client.post("/api/users", json=user, headers=headers).status_code == 201
+
+    def bulk():
+        response = client.post("/api/users/bulk", json={"users": new_users("bulk")}, headers=headers)
+        assert response.status_code == 201, response.text
+
+    results = {
+        "users": args.users,
+        "hash_workers": args.hash_workers,
+        "runs": [measure("serial", serial), measure("bulk", bulk)],
+    }
+    serial_s, bulk_s = (run["elapsed_s"] for run in results["runs"])
+    results["speedup"] = round(serial_s / bulk_s, 2) if bulk_s else None
+    password_pool.shutdown()
+
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Benchmark: concurrent checkout writes with the default vs tuned SQLite engine
+
+Each mode gets a fresh database file. --writers threads run checkout
+transactions: read the product, insert a bill and an item, decrement
+stock, commit. At the same time --readers threads run a sales report
+query. "default" is the original engine (rollback journal, no pool, no
+pragmas). "tuned" is create_db_engine with the DB_SQLITE_* settings.
+Reports commits per second, commit latency and "database is locked"
+errors.
+
+Usage (from backend/):
+    python -m benchmarks.bench_db_writes [--writers 8] [--readers 2] \\
+        [--seconds 10] [--json out.json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import latency_summary
+from app.database import Base, create_db_engine
+from app.models.bill import Bill
+from app.models.bill_item import BillItem
+from app.models.product import Product
+from app.models.user import User
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--json", help="write results to this file")
+    return parser.parse_args()
+
+
+def run(label: str, engine, args) -> dict:
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    with Session() as db:
+        user = User(username="cashier", password_hash="x", full_name="Cashier",
+                    email="cashier@example.com", role="user")
+        product = Product(name="milk", quantity=10_000_000, purchase_price=1.0, selling_price=2.0)
+        db.add_all([user, product])
+        db.commit()
+        user_id, product_id = user.id, product.id
+
+    stop = threading.Event()
+    latencies, reads = [], [0]
+    errors = {"locked": 0, "other": 0}
+    lock = threading.Lock()
+
+    def checkout():
+        while not stop.is_set():
+            started = time.perf_counter()
+            db = Session()
+            try:
+                product = db.query(Product).filter(Product.id == product_id).first()
+                bill = Bill(bill_number=f"BILL-{uuid.uuid4().hex[:12]}",
+                            total_amount=product.selling_price, created_by=user_id)
+                db.add(bill)
+                db.flush()
+                db.add(BillItem(bill_id=bill.id, product_id=product.id, product_name=product.name,
+                                quantity=1, price_per_unit=product.selling_price,
+                                subtotal=product.selling_price))
+                product.quantity -= 1
+                db.commit()
+                with lock:
+                    latencies.append(time.perf_counter() - started)
+            except OperationalError as e:
+                db.rollback()
+                with lock:
+                    errors["locked" if "locked" in str(e) else "other"] += 1
+            finally:
+                db.close()
+
+    def report():
+        while not stop.is_set():
+            db = Session()
+            try:
+                db.query(func.count(Bill.id), func.sum(Bill.total_amount)).one()
+                db.query(BillItem.product_name, func.sum(BillItem.quantity)).group_by(
+                    BillItem.product_name
+                ).all()
+                with lock:
+                    reads[0] += 1
+            except OperationalError:
+                with lock:
+                    errors["locked"] += 1
+            finally:
+                db.close()
+
+    with ThreadPoolExecutor(max_workers=args.writers + args.readers) as executor:
+        futures = [executor.submit(checkout) for _ in range(args.writers)]
+        futures += [executor.submit(report) for _ in range(args.readers)]
+        time.sleep(args.seconds)
+        stop.set()
+        for future in futures:
+            future.result()
+
+    engine.dispose()
+    return {
+        "mode": label,
+        "commits": len(latencies),
+        "commits_per_s": round(len(latencies) / args.seconds, 2),
+        "reports_per_s": round(reads[0] / args.seconds, 2),
+        "errors": errors,
+        "commit_latency": latency_summary(latencies),
+    }
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp()
+
+    def url(name: str) -> str:
+        return f"sqlite:///{os.path.join(workdir, name)}.db"
+
+    results = {
+        "writers": args.writers,
+        "readers": args.readers,
+        "seconds": args.seconds,
+        "runs": [
+            run("default", create_engine(url("default"), connect_args={"check_same_thread": False}), args),
+            run("tuned", create_db_engine(url("tuned")), args),
+        ],
+    }
+
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""
+Benchmark: HTTP load and regression suite for the core endpoints
+
+Fills a temporary database with benchmarks.generate_data (--bills,
+--products, --users), then drives each scenario in turn: login, product
+listing, bill creation, bill listing (all bills and my bills for the last
+week) and the daily sales and profit reports. Each scenario sends
+--requests requests from --concurrency concurrent clients, after --warmup
+unrecorded ones. p50/p95/p99 latency, throughput and status codes are
+recorded per scenario.
+
+--mode uvicorn (default) serves the app on a background uvicorn thread and
+sends requests from a separate process, over real sockets. --mode inprocess
+calls the app through httpx's ASGI transport in the same event loop. It has
+no network or server overhead, so its latencies are lower and steadier than
+under a real server.
+
+Bill numbers come from a row count, so bill creation runs with
+--write-concurrency (default 1) to avoid duplicate numbers. Logins are
+capped at PASSWORD_HASH_MAX_PENDING in flight, so the password pool does not
+answer with 503.
+
+--baseline FILE compares this run with an earlier --json result. The exit
+status is 1 when a latency percentile rises, or throughput falls, by more
+than --tolerance (and by at least --min-delta-ms for latencies), or when any
+request fails. A baseline recorded with different options is refused (exit
+status 2). --update-baseline writes this run to FILE instead of comparing.
+
+Usage (from backend/):
+    python -m benchmarks.bench_http_suite [--mode uvicorn|inprocess] [--concurrency 16] \\
+        [--requests 300] [--bills 20000] [--products 500] [--json out.json]
+    python -m benchmarks.bench_http_suite --baseline benchmarks/http_baseline.json --update-baseline
+    python -m benchmarks.bench_http_suite --baseline benchmarks/http_baseline.json
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, List
+
+from benchmarks.common import ServerThread, latency_summary
+
+# Options that must match for a baseline to be comparable
+CONFIG_KEYS = ("mode", "concurrency", "write_concurrency", "requests", "login_requests",
+               "bills", "products", "users", "seed")
+# Metric -> whether a higher value is worse
+COMPARED = {"p50_ms": True, "p95_ms": True, "p99_ms": True, "rps": False}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=("uvicorn", "inprocess"), default="uvicorn")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight for reads")
+    parser.add_argument("--write-concurrency", type=int, default=1, help="requests in flight for bill creation")
+    parser.add_argument("--requests", type=int, default=300, help="recorded requests per scenario")
+    parser.add_argument("--login-requests", type=int, default=40, help="recorded logins (bcrypt is slow)")
+    parser.add_argument("--warmup", type=int, default=20, help="unrecorded requests per scenario")
+    parser.add_argument("--bills", type=int, default=20000)
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", help="comma separated scenario names")
+    parser.add_argument("--baseline", help="compare with this earlier --json result")
+    parser.add_argument("--update-baseline", action="store_true", help="write this run to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative change")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="ignore latency changes below this")
+    parser.add_argument("--json", help="write results to this file")
+    return parser.parse_args()
+
+
+async def run_scenario(client, spec: Dict, count: int) -> Dict:
+    """Send `count` requests for one scenario from spec["concurrency"] workers"""
+    latencies, statuses = [], Counter()
+    indexes = iter(range(count))
+    bodies = spec.get("bodies")
+
+    async def worker():
+        for index in indexes:
+            started = time.perf_counter()
+            response = await client.request(
+                spec["method"], spec["path"], params=spec.get("params"),
+                json=bodies[index % len(bodies)] if bodies else None, headers=spec.get("headers"),
+            )
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(spec["concurrency"])))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": spec["concurrency"],
+        "requests": len(latencies),
+        "errors": sum(n for code, n in statuses.items() if code >= 400),
+        "status": {str(code): n for code, n in sorted(statuses.items())},
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0,
+        "latency": latency_summary(latencies),
+    }
+
+
+async def run_suite(specs: List[Dict], warmup: int, base_url: str = None, app=None) -> Dict[str, Dict]:
+    import httpx
+
+    limit = max(spec["concurrency"] for spec in specs)
+    limits = httpx.Limits(max_connections=limit, max_keepalive_connections=limit)
+    if app is not None:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120)
+    else:
+        client = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120)
+
+    results = {}
+    async with client:
+        for spec in specs:
+            if warmup:
+                await run_scenario(client, spec, warmup)
+            results[spec["name"]] = await run_scenario(client, spec, spec["count"])
+            print(f"{spec['name']}: {results[spec['name']]['rps']} req/s, "
+                  f"p95 {results[spec['name']]['latency'].get('p95_ms')} ms", file=sys.stderr)
+    return results
+
+
+def run_suite_sync(*args) -> Dict[str, Dict]:
+    return asyncio.run(run_suite(*args))
+
+
+def build_specs(args, admin_token: str, cashier_token: str, usernames: List[str],
+                product_ids: List[int], password: str, max_logins: int) -> List[Dict]:
+    rng = random.Random(args.seed)
+    today = date.today()
+    week = {"start_date": (today - timedelta(days=6)).isoformat(), "end_date": today.isoformat()}
+    admin = {"Authorization": f"Bearer {admin_token}"}
+    cashier = {"Authorization": f"Bearer {cashier_token}"}
+    # One to four lines, like most real baskets
+    baskets = [
+        {"items": [{"product_id": product_id, "quantity": rng.randint(1, 3)}
+                   for product_id in rng.sample(product_ids, rng.randint(1, min(4, len(product_ids))))]}
+        for _ in range(50)
+    ]
+    logins = [{"username": username, "password": password} for username in usernames]
+    reads = args.concurrency
+    return [
+        {"name": "login", "method": "POST", "path": "/api/auth/login", "bodies": logins,
+         "concurrency": min(reads, max_logins), "count": args.login_requests},
+        {"name": "list_products", "method": "GET", "path": "/api/products", "headers": cashier,
+         "concurrency": reads, "count": args.requests},
+        {"name": "create_bill", "method": "POST", "path": "/api/bills", "headers": cashier, "bodies": baskets,
+         "concurrency": args.write_concurrency, "count": args.requests},
+        {"name": "list_bills", "method": "GET", "path": "/api/bills", "params": week, "headers": admin,
+         "concurrency": reads, "count": args.requests},
+        {"name": "my_bills", "method": "GET", "path": "/api/bills/my-bills", "params": week, "headers": cashier,
+         "concurrency": reads, "count": args.requests},
+        {"name": "sales_report", "method": "GET", "path": "/api/reports/sales/daily",
+         "params": {"report_date": today.isoformat()}, "headers": admin, "concurrency": reads, "count": args.requests},
+        {"name": "profit_report", "method": "GET", "path": "/api/reports/profit/daily",
+         "params": {"report_date": today.isoformat()}, "headers": admin, "concurrency": reads, "count": args.requests},
+    ]
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float, min_delta_ms: float) -> List[str]:
+    """Describe every metric that got worse than the baseline allows"""
+    regressions = []
+    for name, before in baseline["scenarios"].items():
+        after = results["scenarios"].get(name)
+        if after is None:
+            continue
+        for metric, higher_is_worse in COMPARED.items():
+            old = before["rps"] if metric == "rps" else before["latency"].get(metric)
+            new = after["rps"] if metric == "rps" else after["latency"].get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if higher_is_worse and change > tolerance and new - old >= min_delta_ms:
+                regressions.append(f"{name} {metric}: {old} -> {new} ms ({change:+.0%}, limit +{tolerance:.0%})")
+            elif not higher_is_worse and change < -tolerance:
+                regressions.append(f"{name} {metric}: {old} -> {new} req/s ({change:+.0%}, limit -{tolerance:.0%})")
+    return regressions
+
+
+def main():
+    args = parse_args()
+    baseline = None
+    if args.baseline and not args.update_baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+
+    config = {key: getattr(args, key) for key in CONFIG_KEYS}
+    if baseline is not None:
+        mismatched = {key: (baseline["config"].get(key), value) for key, value in config.items()
+                      if baseline["config"].get(key) != value}
+        if mismatched:
+            print(f"Baseline was recorded with different options (baseline, now): {mismatched}", file=sys.stderr)
+            return 2
+
+    database_url = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    os.environ["DATABASE_URL"] = database_url
+    password = "password123"
+    generated = subprocess.run(
+        [sys.executable, "-m", "benchmarks.generate_data", "--database-url", database_url,
+         "--bills", str(args.bills), "--products", str(args.products), "--users", str(args.users),
+         "--seed", str(args.seed), "--password", password],
+        capture_output=True, text=True,
+    )
+    if generated.returncode:
+        print(generated.stderr, file=sys.stderr)
+        return generated.returncode
+    data = json.loads(generated.stdout)
+
+    # Import after the environment is set so settings pick it up
+    from sqlalchemy import update
+    from app.config import settings
+    from app.database import SessionLocal
+    from app.main import app
+    from app.models.product import Product
+    from app.models.user import User
+    from app.utils.security import get_access_token
+
+    db = SessionLocal()
+    # Enough stock that bill creation never runs out
+    db.execute(update(Product).values(quantity=10_000_000))
+    admin = User(username="bench_admin", password_hash="x", full_name="Bench Admin",
+                 email="bench_admin@example.com", role="admin")
+    cashier = User(username="bench_cashier", password_hash="x", full_name="Bench Cashier",
+                   email="bench_cashier@example.com", role="user")
+    db.add_all([admin, cashier])
+    db.commit()
+    usernames = [name for (name,) in db.query(User.username).filter(User.is_active, User.password_hash != "x")]
+    product_ids = [product_id for (product_id,) in db.query(Product.id)]
+    specs = build_specs(
+        args,
+        get_access_token({"user_id": admin.id, "role": admin.role}),
+        get_access_token({"user_id": cashier.id, "role": cashier.role}),
+        usernames, product_ids, password, settings.PASSWORD_HASH_MAX_PENDING,
+    )
+    db.close()
+    if args.only:
+        wanted = set(args.only.split(","))
+        specs = [spec for spec in specs if spec["name"] in wanted]
+
+    if args.mode == "inprocess":
+        async def in_process():
+            async with app.router.lifespan_context(app):
+                return await run_suite(specs, args.warmup, app=app)
+        scenarios = asyncio.run(in_process())
+    else:
+        spawn = multiprocessing.get_context("spawn")
+        with ServerThread(app) as api, ProcessPoolExecutor(1, mp_context=spawn) as client:
+            scenarios = client.submit(run_suite_sync, specs, args.warmup, api.url).result()
+
+    results = {
+        "config": config,
+        "data": {key: data[key] for key in ("users", "products", "bills", "bill_items")},
+        "scenarios": scenarios,
+    }
+    failed = [f"{name}: {s['errors']} failed requests {s['status']}" for name, s in scenarios.items() if s["errors"]]
+    if baseline is not None:
+        results["regressions"] = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        results["baseline"] = args.baseline
+
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    if args.update_baseline and args.baseline:
+        with open(args.baseline, "w") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+
+    for line in failed + results.get("regressions", []):
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if failed or results.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
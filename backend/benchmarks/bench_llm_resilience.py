@@ -0,0 +1,88 @@
+"""
+Benchmark: OpenAI client deadlines, hedging and circuit breaker
+
+Runs openai_service against benchmarks.mock_llm with injected faults:
+  1. tail latency - a fraction of calls stall; compares p50/p99 with
+     hedging off and on
+  2. outage       - every call fails; shows the breaker opening and calls
+     short-circuiting to the local fallback message
+
+Usage (from backend/):
+    python -m benchmarks.bench_llm_resilience [--calls 200] [--slow-rate 0.05]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from benchmarks.common import ServerThread, free_port, latency_summary
+from benchmarks import mock_llm
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-ms", type=float, default=2000)
+    parser.add_argument("--hedge-after-ms", type=float, default=200)
+    args = parser.parse_args()
+
+    port = free_port()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    os.environ["OPENAI_MAX_RETRIES"] = "0"
+    os.environ["OPENAI_TIMEOUT_SECONDS"] = "5"
+    os.environ["LLM_BREAKER_RESET_SECONDS"] = "60"
+
+    from app import openai_service
+    from app.config import settings
+
+    messages = [{"role": "user", "content": "price of milk"}]
+    mock_llm.config.latency_ms = args.latency_ms
+    mock_llm.config.token_ms = 0
+    results = {}
+
+    with ServerThread(mock_llm.app, port=port):
+        # Warm up the connection pool
+        openai_service.get_ai_response_with_tools(messages, [])
+
+        mock_llm.config.slow_rate = args.slow_rate
+        mock_llm.config.slow_ms = args.slow_ms
+        for label, hedge_ms in (("no_hedge", 0), ("hedged", args.hedge_after_ms)):
+            settings.OPENAI_HEDGE_AFTER_MS = hedge_ms
+            latencies = []
+            for _ in range(args.calls):
+                started = time.perf_counter()
+                openai_service.get_ai_response_with_tools(messages, [])
+                latencies.append(time.perf_counter() - started)
+            results[label] = latency_summary(latencies)
+        results["hedges"] = {
+            key: value for key, value in openai_service.llm_latency.snapshot().items()
+            if key.startswith("hedges")
+        }
+
+        settings.OPENAI_HEDGE_AFTER_MS = 0
+        mock_llm.config.slow_rate = 0
+        mock_llm.config.error_rate = 1.0
+        outage = []
+        for _ in range(settings.LLM_BREAKER_FAILURES + 20):
+            started = time.perf_counter()
+            text, _ = openai_service.get_ai_response_with_tools(messages, [])
+            outage.append({
+                "ms": round((time.perf_counter() - started) * 1000, 2),
+                "fallback": text == openai_service.LLM_UNAVAILABLE_MESSAGE,
+            })
+        results["outage"] = {
+            "calls_before_open": sum(1 for call in outage if not call["fallback"]),
+            "short_circuited_calls": sum(1 for call in outage if call["fallback"]),
+            "short_circuit_latency": latency_summary([c["ms"] / 1000 for c in outage if c["fallback"]]),
+            "breaker": openai_service.breaker.snapshot(),
+        }
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
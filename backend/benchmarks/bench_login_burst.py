@@ -0,0 +1,134 @@
+"""
+Benchmark: checkout latency during a login burst
+
+Starts the API on a background uvicorn thread with a temporary database.
+Cashier threads create bills while a burst of clients logs in over and
+over. This runs twice: once with bcrypt on the request thread
+(PASSWORD_HASH_WORKERS=0) and once with the password pool. Reports bill and
+login latency plus login status codes. Under the pool, surplus logins get a
+503 instead of taking the request threadpool.
+
+Usage (from backend/):
+    python -m benchmarks.bench_login_burst [--logins 60] [--cashiers 1] \\
+        [--seconds 10] [--hash-workers 2] [--max-pending 8] [--json out.json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import ServerThread, latency_summary
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=60, help="concurrent login clients")
+    # Bill numbers come from a row count, so concurrent cashiers can collide
+    parser.add_argument("--cashiers", type=int, default=1, help="concurrent bill creators")
+    parser.add_argument("--seconds", type=float, default=10, help="duration of each run")
+    parser.add_argument("--hash-workers", type=int, default=2)
+    parser.add_argument("--max-pending", type=int, default=8)
+    parser.add_argument("--json", help="write results to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    os.environ["PASSWORD_HASH_WORKERS"] = "0"
+
+    # Import after the environment is set so settings pick it up
+    import httpx
+    from app.database import Base, SessionLocal, engine
+    from app.main import app
+    from app.models.product import Product
+    from app.models.user import User
+    from app.password_pool import PasswordPool
+    from app.utils import security
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    password_hash = security.get_password_hash("burst")
+    for index in range(args.logins):
+        db.add(User(username=f"clerk{index}", password_hash=password_hash,
+                    full_name="Clerk", email=f"clerk{index}@example.com", role="user"))
+    cashier = User(username="cashier", password_hash=password_hash,
+                   full_name="Cashier", email="cashier@example.com", role="user")
+    product = Product(name="milk", quantity=10_000_000, purchase_price=1.0, selling_price=2.0)
+    db.add_all([cashier, product])
+    db.commit()
+    token = security.get_access_token({"user_id": cashier.id, "role": cashier.role})
+    bill = {"items": [{"product_id": product.id, "quantity": 1}]}
+    db.close()
+
+    def run(label: str, pool: PasswordPool):
+        security.password_pool = pool
+        stop = threading.Event()
+        bill_latencies, login_latencies = [], []
+        bill_errors, login_status = [0], Counter()
+
+        with ServerThread(app) as api:
+            def create_bills():
+                with httpx.Client(base_url=api.url, timeout=60,
+                                  headers={"Authorization": f"Bearer {token}"}) as client:
+                    while not stop.is_set():
+                        started = time.perf_counter()
+                        response = client.post("/api/bills", json=bill)
+                        bill_latencies.append(time.perf_counter() - started)
+                        if response.status_code != 201:
+                            bill_errors[0] += 1
+
+            def log_in(index: int):
+                credentials = {"username": f"clerk{index}", "password": "burst"}
+                with httpx.Client(base_url=api.url, timeout=60) as client:
+                    while not stop.is_set():
+                        started = time.perf_counter()
+                        response = client.post("/api/auth/login", json=credentials)
+                        login_latencies.append(time.perf_counter() - started)
+                        login_status[response.status_code] += 1
+                        if response.status_code == 503:
+                            time.sleep(float(response.headers.get("Retry-After", "1")))
+
+            with ThreadPoolExecutor(max_workers=args.cashiers + args.logins) as executor:
+                futures = [executor.submit(create_bills) for _ in range(args.cashiers)]
+                futures += [executor.submit(log_in, index) for index in range(args.logins)]
+                time.sleep(args.seconds)
+                stop.set()
+                for future in futures:
+                    future.result()
+
+        pool.shutdown()
+        return {
+            "mode": label,
+            "bills": latency_summary(bill_latencies),
+            "bill_errors": bill_errors[0],
+            "bills_per_s": round(len(bill_latencies) / args.seconds, 2),
+            "logins": latency_summary(login_latencies),
+            "login_status": {str(code): count for code, count in sorted(login_status.items())},
+            "pool": pool.stats(),
+        }
+
+    results = {
+        "login_clients": args.logins,
+        "cashiers": args.cashiers,
+        "seconds": args.seconds,
+        "runs": [
+            run("inline", PasswordPool(workers=0, max_pending=0)),
+            run("pool", PasswordPool(workers=args.hash_workers, max_pending=args.max_pending)),
+        ],
+    }
+
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return 1 if any(run["bill_errors"] for run in results["runs"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Benchmark: cost of the metrics recorder and MetricsMiddleware
+
+Times MetricsRegistry.inc and .observe directly, and then a bare ASGI app
+with and without MetricsMiddleware wrapped around it. The difference is
+the per-request instrumentation cost. It also records from --threads
+threads at once to show that the per-thread shards need no lock.
+
+Usage (from backend/):
+    python -m benchmarks.bench_metrics_overhead [--iterations 200000] [--threads 4] [--json out.json]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+
+from app.metrics import MetricsMiddleware, MetricsRegistry
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--json", help="write results to this file")
+    return parser.parse_args()
+
+
+def per_call_us(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    fn(iterations)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+class _Route:
+    path = "/api/products"
+
+
+async def bare_app(scope, receive, send):
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def asgi_us(app, iterations: int) -> float:
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        pass
+
+    async def run():
+        for _ in range(iterations):
+            await app({"type": "http", "method": "GET", "path": "/api/products"}, receive, send)
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    args = parse_args()
+    registry = MetricsRegistry()
+    labels = (("method", "GET"), ("route", "/api/products"))
+
+    def incs(n):
+        for _ in range(n):
+            registry.inc("http_requests_total", labels)
+
+    def observes(n):
+        for i in range(n):
+            registry.observe("http_request_duration_seconds", (i % 100) / 1000, labels)
+
+    inc_us = per_call_us(incs, args.iterations)
+    observe_us = per_call_us(observes, args.iterations)
+
+    requests = args.iterations // 4
+    bare_us = asgi_us(bare_app, requests)
+    wrapped_us = asgi_us(MetricsMiddleware(bare_app, MetricsRegistry()), requests)
+
+    threaded = MetricsRegistry()
+    per_thread = args.iterations // args.threads
+
+    def worker():
+        for _ in range(per_thread):
+            threaded.inc("bills_created_total")
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    threaded_total = int(next(
+        line for line in threaded.render().splitlines() if line.startswith("bills_created_total ")
+    ).split()[-1])
+
+    results = {
+        "inc_us": round(inc_us, 3),
+        "observe_us": round(observe_us, 3),
+        "asgi_bare_us": round(bare_us, 2),
+        "asgi_with_metrics_us": round(wrapped_us, 2),
+        "middleware_overhead_us": round(wrapped_us - bare_us, 2),
+        "threaded_total": threaded_total,
+        "threaded_expected": per_thread * args.threads,
+    }
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return 0 if threaded_total == per_thread * args.threads else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
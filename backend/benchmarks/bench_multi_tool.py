@@ -0,0 +1,101 @@
+"""
+Benchmark: end-to-end latency of multi-part voice questions
+
+Simulates an LLM with a fixed round-trip latency and compares:
+  * sequential - one tool call per LLM turn (the old behaviour, N turns)
+  * batched    - all tool calls from a single turn, read-only tools run
+                 concurrently
+
+Usage (from backend/):
+    python -m benchmarks.bench_multi_tool [--llm-ms 400] [--parts 3] [--rounds 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+os.environ["VOICE_FAST_PATH"] = "false"
+os.environ["VOICE_CACHE_SIZE"] = "0"
+
+from fastapi.testclient import TestClient
+
+from app.database import Base, SessionLocal, engine
+from app.main import app
+from app.models.product import Product
+from app.models.user import User
+from app.routers import voice
+from app.utils.security import get_access_token, get_password_hash
+
+
+PRODUCTS = ["milk", "bread", "eggs", "cheese", "butter", "rice", "tea", "coffee"]
+
+
+def setup() -> dict:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(
+        username="bench", password_hash=get_password_hash("bench"),
+        full_name="Bench", email="bench@example.com", role="admin"
+    )
+    db.add(user)
+    for name in PRODUCTS:
+        db.add(Product(name=name, quantity=100, purchase_price=1.0, selling_price=2.0))
+    db.commit()
+    token = get_access_token({"user_id": user.id, "role": user.role})
+    db.close()
+    return {"Authorization": f"Bearer {token}"}
+
+
+def fake_llm(llm_seconds: float, tool_calls: list):
+    def respond(messages, tools):
+        time.sleep(llm_seconds)
+        return None, tool_calls
+    return respond
+
+
+def price_call(name: str) -> dict:
+    return {"id": f"call_{name}", "name": "get_product_price", "arguments": {"product_name": name}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--llm-ms", type=float, default=400)
+    parser.add_argument("--parts", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    headers = setup()
+    client = TestClient(app)
+    llm_seconds = args.llm_ms / 1000
+    names = PRODUCTS[:args.parts]
+    question = "price of " + ", ".join(names)
+
+    sequential, batched = [], []
+    for round_number in range(args.rounds):
+        started = time.perf_counter()
+        for name in names:
+            voice.get_ai_response_with_tools = fake_llm(llm_seconds, [price_call(name)])
+            client.post("/api/voice/chat", headers=headers,
+                        json={"session_id": f"seq-{round_number}", "message": question})
+        sequential.append(time.perf_counter() - started)
+
+        voice.get_ai_response_with_tools = fake_llm(llm_seconds, [price_call(n) for n in names])
+        started = time.perf_counter()
+        client.post("/api/voice/chat", headers=headers,
+                    json={"session_id": f"batch-{round_number}", "message": question})
+        batched.append(time.perf_counter() - started)
+
+    seq_ms = statistics.median(sequential) * 1000
+    batch_ms = statistics.median(batched) * 1000
+    print(f"{args.parts}-part question, simulated LLM latency {args.llm_ms:.0f} ms")
+    print(f"  sequential (1 tool/turn): {seq_ms:8.1f} ms median")
+    print(f"  batched (all tools/turn): {batch_ms:8.1f} ms median")
+    print(f"  speed-up: {seq_ms / batch_ms:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
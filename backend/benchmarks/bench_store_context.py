@@ -0,0 +1,96 @@
+"""
+Benchmark: voice system prompt size and build time versus catalog size
+
+Compares the old full-inventory dump with the retrieval-based context.
+
+Usage (from backend/):
+    python -m benchmarks.bench_store_context [--sizes 100,1000,10000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+
+from app.database import Base, SessionLocal, engine
+from app.models.product import Product
+from app.product_index import product_index
+from app.routers.voice import get_store_context, get_system_prompt
+
+
+WORDS = [
+    "milk", "bread", "eggs", "cheese", "butter", "apple", "banana", "rice",
+    "sugar", "salt", "tea", "coffee", "juice", "soap", "shampoo", "chicken",
+    "beef", "yogurt", "flour", "oil", "pasta", "tomato", "onion", "potato",
+]
+CATEGORIES = ["dairy", "bakery", "produce", "pantry", "household", "meat"]
+QUERY = "how much is the organic milk and do we have brown bread"
+
+
+def full_dump_context(db) -> str:
+    """The original implementation: one line per product"""
+    products = db.query(Product).all()
+    return "Current store inventory:\n" + "\n".join(
+        f"- {p.name}: {p.quantity} in stock, sells for ${p.selling_price:.2f}"
+        for p in products
+    )
+
+
+def populate(db, count: int):
+    rng = random.Random(count)
+    db.query(Product).delete()
+    db.bulk_insert_mappings(Product, [
+        {
+            "name": f"{rng.choice(['organic', 'brown', 'fresh', 'large'])} {rng.choice(WORDS)} {i}",
+            "quantity": rng.randint(0, 200),
+            "purchase_price": 1.0,
+            "selling_price": round(rng.uniform(1, 20), 2),
+            "category": rng.choice(CATEGORIES),
+        }
+        for i in range(count)
+    ])
+    db.commit()
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="100,1000,10000,50000")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+
+    print(f"{'products':>9} | {'full chars':>10} {'~tokens':>8} {'ms':>8} | "
+          f"{'retrieval chars':>15} {'~tokens':>8} {'cold ms':>8} {'warm ms':>8}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        populate(db, size)
+
+        full_prompt = get_system_prompt(full_dump_context(db), "user")
+        full_ms = timed(lambda: full_dump_context(db))
+
+        product_index._snapshot = None  # force a rebuild for the cold timing
+        cold_ms = timed(lambda: get_store_context(db, QUERY), repeat=1)
+        warm_ms = timed(lambda: get_store_context(db, QUERY))
+        retrieval_prompt = get_system_prompt(get_store_context(db, QUERY), "user")
+
+        print(f"{size:>9} | {len(full_prompt):>10} {len(full_prompt) // 4:>8} {full_ms:>8.2f} | "
+              f"{len(retrieval_prompt):>15} {len(retrieval_prompt) // 4:>8} {cold_ms:>8.2f} {warm_ms:>8.2f}")
+
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Benchmark: /api/voice/chat against the local mock LLM
+
+Starts benchmarks.mock_llm and the API on background uvicorn threads, seeds
+a temporary database, then drives scripted voice conversations from
+concurrent virtual users. Reports p50/p95/p99 latency, throughput and DB
+queries per turn.
+
+Usage (from backend/):
+    python -m benchmarks.bench_voice [--users 8] [--conversations 40] \\
+        [--latency-ms 300] [--stream] [--fast-path] [--json out.json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import ServerThread, free_port, latency_summary
+from benchmarks import mock_llm
+
+SCRIPTS = [
+    ["how many milk do we have", "price of bread", "sell 2 milk and 1 bread"],
+    ["list all products", "price of eggs, cheese and butter", "thanks"],
+    ["what are today's sales", "show the profit report", "any low stock products"],
+    ["how many rice do we have", "sell 3 rice", "how many rice do we have"],
+]
+PRODUCTS = ["milk", "bread", "eggs", "cheese", "butter", "rice", "tea", "coffee"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=8, help="concurrent virtual users")
+    parser.add_argument("--conversations", type=int, default=40)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=15)
+    parser.add_argument("--stream", action="store_true", help="use /api/voice/chat/stream")
+    parser.add_argument("--fast-path", action="store_true", help="enable the local intent parser")
+    parser.add_argument("--cache", action="store_true", help="enable the voice response cache")
+    parser.add_argument("--json", help="write results to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    mock_port = free_port()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{mock_port}/v1"
+    os.environ["VOICE_FAST_PATH"] = "true" if args.fast_path else "false"
+    os.environ["VOICE_CACHE_SIZE"] = "256" if args.cache else "0"
+    mock_llm.config.latency_ms = args.latency_ms
+    mock_llm.config.token_ms = args.token_ms
+
+    # Import after the environment is set so settings and the client pick it up
+    import httpx
+    from sqlalchemy import event
+    from app.database import Base, SessionLocal, engine
+    from app.main import app
+    from app.models.product import Product
+    from app.models.user import User
+    from app.utils.security import get_access_token, get_password_hash
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(username="bench", password_hash=get_password_hash("bench"),
+                full_name="Bench", email="bench@example.com", role="admin")
+    db.add(user)
+    for name in PRODUCTS:
+        db.add(Product(name=name, quantity=1_000_000, purchase_price=1.0, selling_price=2.0))
+    db.commit()
+    headers = {"Authorization": f"Bearer {get_access_token({'user_id': user.id, 'role': user.role})}"}
+    db.close()
+
+    query_count = [0]
+    count_lock = threading.Lock()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_query(*_):
+        with count_lock:
+            query_count[0] += 1
+
+    path = "/api/voice/chat/stream" if args.stream else "/api/voice/chat"
+    turn_latencies, first_byte_latencies, errors = [], [], [0]
+
+    with ServerThread(mock_llm.app, port=mock_port), ServerThread(app) as api:
+        def run_conversation(index: int):
+            script = SCRIPTS[index % len(SCRIPTS)]
+            with httpx.Client(base_url=api.url, headers=headers, timeout=60) as client:
+                for message in script:
+                    body = {"session_id": f"bench-{index}", "message": message}
+                    started = time.perf_counter()
+                    if args.stream:
+                        with client.stream("POST", path, json=body) as response:
+                            first = None
+                            for _ in response.iter_bytes():
+                                first = first or time.perf_counter()
+                            ok = response.status_code == 200
+                        first_byte_latencies.append((first or time.perf_counter()) - started)
+                    else:
+                        ok = client.post(path, json=body).status_code == 200
+                    turn_latencies.append(time.perf_counter() - started)
+                    if not ok:
+                        errors[0] += 1
+
+        queries_before = query_count[0]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.users) as pool:
+            list(pool.map(run_conversation, range(args.conversations)))
+        elapsed = time.perf_counter() - started
+
+    turns = len(turn_latencies)
+    results = {
+        "endpoint": path,
+        "users": args.users,
+        "conversations": args.conversations,
+        "llm_latency_ms": args.latency_ms,
+        "fast_path": args.fast_path,
+        "cache": args.cache,
+        "turns": turns,
+        "errors": errors[0],
+        "elapsed_s": round(elapsed, 3),
+        "throughput_turns_per_s": round(turns / elapsed, 2),
+        "latency": latency_summary(turn_latencies),
+        "db_queries_per_turn": round((query_count[0] - queries_before) / max(turns, 1), 2),
+    }
+    if args.stream:
+        results["first_byte_latency"] = latency_summary(first_byte_latencies)
+
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return 1 if errors[0] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
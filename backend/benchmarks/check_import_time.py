@@ -0,0 +1,95 @@
+"""
+Check: import time of app.main against a budget
+
+Runs `python -X importtime -c "import app.main"` in fresh interpreters and
+takes the median cumulative time of app.main. It also checks that modules
+meant to load lazily (the OpenAI SDK, tiktoken) were not imported. Prints
+the slowest imports and exits non-zero when over budget. It can be run as
+a CI gate.
+
+Usage (from backend/):
+    python -m benchmarks.check_import_time [--budget-ms 1000] [--runs 5] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Only loaded on the first voice request
+LAZY_MODULES = ("openai", "tiktoken")
+
+PROBE = (
+    "import sys, json, app.main; "
+    "print(json.dumps([m for m in %r if m in sys.modules]))" % (LAZY_MODULES,)
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=1000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--json", help="write results to this file")
+    return parser.parse_args()
+
+
+def parse_importtime(stderr: str):
+    """Yield (self_us, cumulative_us, module) for each -X importtime line"""
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        yield int(self_us), int(cumulative_us), module.strip()
+
+
+def measure_once(env: dict):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        capture_output=True, text=True, env=env, check=True
+    )
+    rows = list(parse_importtime(result.stderr))
+    total = next(cumulative for _, cumulative, module in rows if module == "app.main")
+    return total / 1000, rows, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    args = parse_args()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tempfile.mkdtemp()}/check.db")
+
+    # First run warms the bytecode cache and is discarded
+    measure_once(env)
+    samples, rows, eager = [], [], []
+    for _ in range(args.runs):
+        total_ms, rows, eager = measure_once(env)
+        samples.append(total_ms)
+
+    median_ms = statistics.median(samples)
+    slowest = sorted(rows, key=lambda row: row[0], reverse=True)[:args.top]
+    results = {
+        "median_ms": round(median_ms, 1),
+        "samples_ms": [round(sample, 1) for sample in samples],
+        "budget_ms": args.budget_ms,
+        "eagerly_imported": eager,
+        "slowest_self_ms": {module: round(self_us / 1000, 1) for self_us, _, module in slowest},
+    }
+    failures = []
+    if median_ms > args.budget_ms:
+        failures.append(f"import app.main took {median_ms:.0f}ms (budget {args.budget_ms:.0f}ms)")
+    if eager:
+        failures.append(f"imported at startup but should be lazy: {', '.join(eager)}")
+    results["ok"] = not failures
+
+    print(json.dumps(results, indent=2))
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Check: SQL statements per request against per-endpoint budgets
+
+Seeds a throwaway database with --bills bills and calls each endpoint in
+BUDGETS once to warm the auth caches. It then calls each again under
+app.query_stats.assert_max_queries. Budgets are fixed numbers, so an
+endpoint whose query count grows with the data (an N+1) fails no matter
+how much data is seeded. Exits non-zero on any failure, so it can be run
+as a CI gate.
+
+Usage (from backend/):
+    python -m benchmarks.check_query_counts [--bills 30] [--json out.json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from datetime import date
+
+NEW_BILL = {"items": [{"product_id": 1, "quantity": 1}, {"product_id": 2, "quantity": 1},
+                      {"product_id": 3, "quantity": 1}]}
+
+# (method, path, body, max statements). {bill_id} and {today} are filled in after seeding.
+# Creating a bill inserts its items one row at a time (their ids are returned),
+# so that budget covers the three-item NEW_BILL, plus the data_versions upsert.
+BUDGETS = [
+    ("GET", "/api/products", None, 1),
+    ("GET", "/api/products/1", None, 1),
+    ("POST", "/api/bills", NEW_BILL, 8),
+    ("GET", "/api/bills", None, 2),
+    ("GET", "/api/bills/my-bills", None, 2),
+    ("GET", "/api/bills/{bill_id}", None, 2),
+    ("GET", "/api/bills?start_date={today}", None, 3),
+    ("GET", "/api/reports/sales/daily", None, 2),
+    ("GET", "/api/reports/profit/daily", None, 2),
+    ("GET", "/api/users", None, 1),
+    ("GET", "/api/users/summary", None, 1),
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bills", type=int, default=30, help="bills seeded before checking")
+    parser.add_argument("--json", help="write results to this file")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/check.db"
+    os.environ["PASSWORD_HASH_WORKERS"] = "0"
+
+    # Import after the environment is set so settings pick it up
+    from fastapi.testclient import TestClient
+    from app.database import Base, SessionLocal, engine
+    from app.main import app
+    from app.models.product import Product
+    from app.models.user import User
+    from app.query_stats import assert_max_queries
+    from app.utils.security import get_access_token, get_password_hash
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    admin = User(username="root", password_hash=get_password_hash("root"),
+                 full_name="Root", email="root@example.com", role="super_admin")
+    db.add(admin)
+    for name in ("Milk", "Bread", "Eggs"):
+        db.add(Product(name=name, quantity=args.bills * 10 + 100, purchase_price=1.0, selling_price=2.0))
+    db.commit()
+    headers = {"Authorization": f"Bearer {get_access_token({'user_id': admin.id, 'role': admin.role})}"}
+    db.close()
+
+    client = TestClient(app)
+    bill = {"items": [{"product_id": 1, "quantity": 1}, {"product_id": 2, "quantity": 2}]}
+    bill_id = None
+    for _ in range(args.bills):
+        response = client.post("/api/bills", json=bill, headers=headers)
+        assert response.status_code == 201, response.text
+        bill_id = response.json()["id"]
+
+    results, failures = {}, []
+    for method, path, body, budget in BUDGETS:
+        url = path.format(bill_id=bill_id, today=date.today().isoformat())
+        client.request(method, url, json=body, headers=headers)  # warm-up
+        statements = []
+        try:
+            with assert_max_queries(budget) as statements:
+                response = client.request(method, url, json=body, headers=headers)
+            if response.status_code >= 400:
+                failures.append(f"{method} {url} returned {response.status_code}")
+        except AssertionError as e:
+            failures.append(f"{method} {path}: {e}")
+        results[f"{method} {path}"] = {"budget": budget, "queries": len(statements)}
+
+    report = {"bills": args.bills, "endpoints": results, "ok": not failures}
+    print(json.dumps(report, indent=2))
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(report, fh, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+"""
+Generate: synthetic users, products and bills for scale testing
+
+Fills the database at DATABASE_URL (or --database-url) with cashiers,
+products and bills:
+- Products are spread over categories and suppliers with a Zipf skew.
+- Each bill's basket size and the products in it are Zipf-distributed, so
+  a few products dominate sales, as in a real store.
+- Bills are spread over --start..--end, busier in the evening and at the
+  weekend. Ids rise with time, as they would in production.
+
+Bills and items are passed as tuples straight to the driver's executemany,
+in --batch sized transactions. This bypasses the ORM session (no autoflush,
+no identity map, no per-row RETURNING) and SQLAlchemy's per-row parameter
+processing, which took most of the load time. Ids are assigned up front so
+bill items can reference their bill straight away. The same --seed always
+produces the same data.
+
+Usage (from backend/):
+    python -m benchmarks.generate_data [--users 50] [--products 2000] [--bills 100000]
+        [--start 2025-01-01] [--end 2025-12-31] [--seed 42] [--batch 20000] [--json out.json]
+    python -m benchmarks.generate_data --database-url sqlite:///./scale.db --bills 4000000
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from typing import Dict, List, Sequence
+
+CATEGORIES = {
+    "Dairy": ["Milk", "Yogurt", "Cheddar", "Butter", "Cream", "Paneer"],
+    "Bakery": ["Bread", "Bagels", "Croissant", "Muffins", "Buns", "Rusk"],
+    "Produce": ["Bananas", "Apples", "Tomatoes", "Onions", "Potatoes", "Spinach"],
+    "Beverages": ["Cola", "Orange Juice", "Green Tea", "Coffee", "Mineral Water", "Lemonade"],
+    "Snacks": ["Chips", "Cookies", "Peanuts", "Crackers", "Popcorn", "Chocolate"],
+    "Pantry": ["Rice", "Flour", "Sugar", "Lentils", "Pasta", "Olive Oil"],
+    "Household": ["Detergent", "Dish Soap", "Paper Towels", "Trash Bags", "Sponges", "Bleach"],
+    "Personal Care": ["Shampoo", "Toothpaste", "Soap", "Lotion", "Deodorant", "Razor"],
+    "Frozen": ["Ice Cream", "Frozen Peas", "Pizza", "Fish Fingers", "Fries", "Dumplings"],
+    "Baby": ["Diapers", "Baby Wipes", "Formula", "Baby Food", "Baby Oil", "Rash Cream"],
+}
+BRANDS = ["Acme", "Sunrise", "Golden", "Fresh Farm", "Everyday", "Prime", "Nature's", "Blue Hill"]
+SIZES = ["Small", "Regular", "Large", "Family Pack", "500g", "1kg", "1L", "2L"]
+
+# Share of a day's bills in each hour the store is open (08:00-21:59)
+HOUR_WEIGHTS = {8: 3, 9: 4, 10: 5, 11: 6, 12: 8, 13: 7, 14: 5, 15: 5, 16: 6, 17: 9, 18: 11, 19: 10, 20: 7, 21: 4}
+# Monday .. Sunday
+WEEKDAY_WEIGHTS = (0.9, 0.85, 0.9, 0.95, 1.1, 1.35, 1.25)
+QUANTITY_WEIGHTS = {1: 60, 2: 22, 3: 10, 4: 5, 5: 3}
+
+
+def parse_args():
+    today = date.today()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--bills", type=int, default=100000)
+    parser.add_argument("--start", type=date.fromisoformat, default=today - timedelta(days=365))
+    parser.add_argument("--end", type=date.fromisoformat, default=today)
+    parser.add_argument("--max-basket", type=int, default=12)
+    parser.add_argument("--zipf", type=float, default=1.1, help="skew exponent for products, baskets and cashiers")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch", type=int, default=20000, help="bills per transaction")
+    parser.add_argument("--password", default="password123", help="password for every generated user")
+    parser.add_argument("--json", help="write results to this file")
+    return parser.parse_args()
+
+
+def zipf_cum_weights(n: int, s: float) -> List[float]:
+    return list(accumulate(1 / (rank ** s) for rank in range(1, n + 1)))
+
+
+def bills_per_day(rng: random.Random, total: int, start: date, end: date) -> List[int]:
+    """Split `total` bills over the days in [start, end] by weekday weight, with +-15% noise"""
+    days = (end - start).days + 1
+    weights = [WEEKDAY_WEIGHTS[(start + timedelta(d)).weekday()] * rng.uniform(0.85, 1.15) for d in range(days)]
+    scale = total / sum(weights)
+    exact = [w * scale for w in weights]
+    counts = [int(x) for x in exact]
+    # Hand the rounding remainder to the days with the largest fractions
+    by_fraction = sorted(range(days), key=lambda d: exact[d] - counts[d], reverse=True)
+    for d in by_fraction[:total - sum(counts)]:
+        counts[d] += 1
+    return counts
+
+
+def make_products(rng: random.Random, count: int, first_id: int) -> List[Dict]:
+    categories = list(CATEGORIES)
+    category_weights = zipf_cum_weights(len(categories), 0.8)
+    now = datetime.utcnow()
+    rows = []
+    for i in range(count):
+        category = rng.choices(categories, cum_weights=category_weights)[0]
+        # Each category buys mostly from its first couple of suppliers
+        supplier_rank = rng.choices(range(1, 6), cum_weights=zipf_cum_weights(5, 1.2))[0]
+        purchase = round(math.exp(rng.gauss(1.2, 0.8)), 2) + 0.1
+        rows.append({
+            "id": first_id + i,
+            "name": f"{rng.choice(BRANDS)} {rng.choice(CATEGORIES[category])} {rng.choice(SIZES)}",
+            "quantity": rng.choice((0, 3, 8)) if rng.random() < 0.05 else rng.randint(20, 500),
+            "purchase_price": round(purchase, 2),
+            "selling_price": round(purchase * rng.uniform(1.1, 1.6), 2),
+            "category": category,
+            "supplier": f"{category} Supplier {supplier_rank}",
+            "created_at": now,
+            "updated_at": now,
+        })
+    return rows
+
+
+def make_users(rng: random.Random, count: int, first_id: int, password_hash: str, tag: str) -> List[Dict]:
+    now = datetime.utcnow()
+    return [
+        {
+            "id": first_id + i,
+            "username": f"{tag}_user{i:05d}",
+            "password_hash": password_hash,
+            "full_name": f"Cashier {i:05d}",
+            "email": f"{tag}_user{i:05d}@example.com",
+            "role": "admin" if rng.random() < 0.05 else "user",
+            "is_active": rng.random() > 0.03,
+            "created_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+BILL_COLUMNS = ("id", "bill_number", "total_amount", "created_by", "created_at")
+ITEM_COLUMNS = ("id", "bill_id", "product_id", "product_name", "quantity", "price_per_unit", "subtotal")
+
+
+def driver_insert(conn, table, columns: Sequence[str]):
+    """
+    Compile one INSERT for `table` and return a function that runs it with
+    driver-level executemany on a list of tuples ordered like `columns`
+    """
+    compiled = table.insert().compile(dialect=conn.dialect, column_keys=list(columns))
+    sql = str(compiled)
+    if conn.dialect.positional:
+        order = [columns.index(name) for name in compiled.positiontup]
+        if order == list(range(len(columns))):
+            return lambda rows: conn.exec_driver_sql(sql, rows)
+        return lambda rows: conn.exec_driver_sql(sql, [tuple(row[i] for i in order) for row in rows])
+    return lambda rows: conn.exec_driver_sql(sql, [dict(zip(columns, row)) for row in rows])
+
+
+def main():
+    args = parse_args()
+    if args.end < args.start:
+        print("--end must not be before --start", file=sys.stderr)
+        return 2
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    # One bcrypt hash is reused for every user; no need for the process pool
+    os.environ["PASSWORD_HASH_WORKERS"] = "0"
+
+    # Import after the environment is set so settings pick it up
+    from sqlalchemy import func, select
+    import app.models  # noqa: F401  register every model before the schema check
+    from app.database import engine
+    from app.models.bill import Bill
+    from app.models.bill_archive import BillArchivePeriod
+    from app.models.bill_item import BillItem
+    from app.models.product import Product
+    from app.models.user import User
+    from app.schema import ensure_schema
+    from app.utils.security import get_password_hash
+
+    ensure_schema(engine)
+    rng = random.Random(args.seed)
+    results = {"database": str(engine.url), "seed": args.seed}
+    started = time.perf_counter()
+
+    with engine.connect() as conn:
+        def next_id(*columns) -> int:
+            return max((conn.execute(select(func.max(column))).scalar() or 0) for column in columns) + 1
+
+        first_user = next_id(User.id)
+        first_product = next_id(Product.id)
+        first_bill = next_id(Bill.id, BillArchivePeriod.max_bill_id)
+        first_item = next_id(BillItem.id)
+
+        phase = time.perf_counter()
+        tag = f"s{args.seed}_{first_user}"
+        users = make_users(rng, args.users, first_user, get_password_hash(args.password), tag)
+        products = make_products(rng, args.products, first_product)
+        with conn.begin():
+            conn.execute(User.__table__.insert(), users)
+            conn.execute(Product.__table__.insert(), products)
+        results["users"] = len(users)
+        results["products"] = len(products)
+        results["catalog_s"] = round(time.perf_counter() - phase, 2)
+
+        # Popularity ranks are shuffled so the best sellers are not simply the lowest ids
+        by_popularity: Sequence[Dict] = rng.sample(products, len(products))
+        product_weights = zipf_cum_weights(len(by_popularity), args.zipf)
+        cashiers = [user["id"] for user in users if user["is_active"]] or [user["id"] for user in users]
+        cashier_weights = zipf_cum_weights(len(cashiers), 0.7)
+        basket_sizes = list(range(1, args.max_basket + 1))
+        basket_weights = zipf_cum_weights(args.max_basket, args.zipf)
+        quantities, quantity_weights = list(QUANTITY_WEIGHTS), list(accumulate(QUANTITY_WEIGHTS.values()))
+        hours, hour_weights = list(HOUR_WEIGHTS), list(accumulate(HOUR_WEIGHTS.values()))
+
+        phase = time.perf_counter()
+        bill_id, item_id = first_bill, first_item
+        bill_rows, item_rows = [], []
+        total_items = 0
+        insert_bills = driver_insert(conn, Bill.__table__, BILL_COLUMNS)
+        insert_items = driver_insert(conn, BillItem.__table__, ITEM_COLUMNS)
+        # Driver-level inserts skip SQLAlchemy's type processing, so write
+        # datetimes the way its SQLite dialect stores them
+        sqlite = engine.dialect.name == "sqlite"
+
+        def flush():
+            with conn.begin():
+                insert_bills(bill_rows)
+                insert_items(item_rows)
+            bill_rows.clear()
+            item_rows.clear()
+
+        for day_offset, day_count in enumerate(bills_per_day(rng, args.bills, args.start, args.end)):
+            if not day_count:
+                continue
+            day = datetime.combine(args.start + timedelta(days=day_offset), datetime.min.time())
+            seconds = sorted(
+                hour * 3600 + rng.randrange(3600)
+                for hour in rng.choices(hours, cum_weights=hour_weights, k=day_count)
+            )
+            sizes = rng.choices(basket_sizes, cum_weights=basket_weights, k=day_count)
+            picks = rng.choices(by_popularity, cum_weights=product_weights, k=sum(sizes))
+            counts = rng.choices(quantities, cum_weights=quantity_weights, k=len(picks))
+            sellers = rng.choices(cashiers, cum_weights=cashier_weights, k=day_count)
+
+            position = 0
+            for second, size, seller in zip(seconds, sizes, sellers):
+                created_at = day + timedelta(seconds=second)
+                total = 0.0
+                for product, quantity in zip(picks[position:position + size], counts[position:position + size]):
+                    price = product["selling_price"]
+                    subtotal = round(price * quantity, 2)
+                    total += subtotal
+                    item_rows.append((item_id, bill_id, product["id"], product["name"], quantity, price, subtotal))
+                    item_id += 1
+                position += size
+                bill_rows.append((
+                    bill_id, f"BILL{created_at:%Y%m%d}{bill_id:04d}", round(total, 2), seller,
+                    f"{created_at:%Y-%m-%d %H:%M:%S}.000000" if sqlite else created_at,
+                ))
+                bill_id += 1
+                if len(bill_rows) >= args.batch:
+                    total_items += len(item_rows)
+                    flush()
+            print(f"\r{bill_id - first_bill} bills, {total_items + len(item_rows)} items", end="", file=sys.stderr)
+
+        total_items += len(item_rows)
+        if bill_rows:
+            flush()
+        print(file=sys.stderr)
+        elapsed = time.perf_counter() - phase
+
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("ANALYZE")
+
+    results.update({
+        "bills": bill_id - first_bill,
+        "bill_items": total_items,
+        "bill_id_range": [first_bill, bill_id - 1],
+        "date_range": [args.start.isoformat(), args.end.isoformat()],
+        "bills_s": round(elapsed, 2),
+        "items_per_s": round(total_items / elapsed) if elapsed else None,
+        "total_s": round(time.perf_counter() - started, 2),
+        "password": args.password,
+    })
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
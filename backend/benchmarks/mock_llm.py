@@ -0,0 +1,184 @@
+"""
+Mock LLM - Local OpenAI-compatible stand-in for benchmarks and offline runs
+
+Implements POST /v1/chat/completions (plain and streaming) with simple
+keyword rules that produce the same tool calls the real model would for the
+voice assistant's common requests. Latency is configurable so benchmarks
+can model a slow or fast provider.
+
+Usage (from backend/):
+    python -m benchmarks.mock_llm --port 8001 --latency-ms 300 --token-ms 15
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+class MockConfig:
+    latency_ms = 300.0
+    token_ms = 15.0
+    # Fault injection: fraction of requests that fail with a 500 or stall
+    error_rate = 0.0
+    slow_rate = 0.0
+    slow_ms = 3000.0
+
+
+config = MockConfig()
+app = FastAPI(title="Mock LLM")
+
+ITEM = re.compile(r"(\d+)\s+([a-z][a-z ]*?)(?=\s*(?:,|\band\b|$))")
+
+
+def plan_reply(messages: List[Dict]) -> Dict:
+    """Pick a tool call or text reply from the last user message"""
+    user_messages = [m for m in messages if m.get("role") == "user"]
+    text = (user_messages[-1]["content"] if user_messages else "").lower().strip(" ?.!")
+
+    def call(name: str, arguments: Dict) -> Dict:
+        return {"tool_calls": [{"name": name, "arguments": arguments}]}
+
+    if text.startswith(("sell", "bill", "checkout")):
+        items = [
+            {"product_name": name.strip(), "quantity": int(quantity)}
+            for quantity, name in ITEM.findall(text)
+        ]
+        if items:
+            return call("create_bill", {"items": items})
+    if "price" in text or "cost" in text:
+        names = re.split(r"\s*(?:,|\band\b)\s*", re.sub(r"^.*?\b(?:of|for)\b\s*", "", text))
+        return {"tool_calls": [
+            {"name": "get_product_price", "arguments": {"product_name": name}}
+            for name in names if name
+        ]}
+    if "how many" in text or "stock of" in text:
+        name = re.sub(r"^how many\s+|\s+(?:do we have|are left|in stock).*$|^.*stock of\s+", "", text)
+        return call("check_product_stock", {"product_name": name})
+    if "low stock" in text:
+        return call("get_low_stock_products", {})
+    if "list" in text and "product" in text:
+        return call("list_all_products", {})
+    if "sales" in text:
+        return call("get_daily_sales", {})
+    if "profit" in text:
+        return call("get_profit_loss_report", {})
+    if "users" in text:
+        return call("get_all_users", {})
+
+    return {"content": "Sure. I can check stock, prices and sales, or create a bill for you."}
+
+
+def completion_id() -> str:
+    return f"chatcmpl-{uuid.uuid4().hex[:24]}"
+
+
+def tool_call_payload(index: int, tool_call: Dict) -> Dict:
+    return {
+        "index": index,
+        "id": f"call_{uuid.uuid4().hex[:12]}",
+        "type": "function",
+        "function": {"name": tool_call["name"], "arguments": json.dumps(tool_call["arguments"])},
+    }
+
+
+def full_response(model: str, reply: Dict) -> Dict:
+    message: Dict = {"role": "assistant", "content": reply.get("content")}
+    if reply.get("tool_calls"):
+        message["tool_calls"] = [
+            {k: v for k, v in tool_call_payload(i, tc).items() if k != "index"}
+            for i, tc in enumerate(reply["tool_calls"])
+        ]
+    return {
+        "id": completion_id(),
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": message,
+            "finish_reason": "tool_calls" if reply.get("tool_calls") else "stop",
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+async def stream_chunks(model: str, reply: Dict):
+    chunk_id = completion_id()
+
+    def chunk(delta: Dict, finish_reason: Optional[str] = None) -> str:
+        body = {
+            "id": chunk_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(body)}\n\n"
+
+    await asyncio.sleep(config.latency_ms / 1000)
+    yield chunk({"role": "assistant", "content": ""})
+
+    if reply.get("tool_calls"):
+        for index, tool_call in enumerate(reply["tool_calls"]):
+            yield chunk({"tool_calls": [tool_call_payload(index, tool_call)]})
+        yield chunk({}, "tool_calls")
+    else:
+        for word in re.findall(r"\S+\s*", reply["content"]):
+            await asyncio.sleep(config.token_ms / 1000)
+            yield chunk({"content": word})
+        yield chunk({}, "stop")
+
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "mock")
+    reply = plan_reply(body.get("messages", []))
+
+    if random.random() < config.error_rate:
+        return JSONResponse({"error": {"message": "injected failure", "type": "server_error"}}, status_code=500)
+    if random.random() < config.slow_rate:
+        await asyncio.sleep(config.slow_ms / 1000)
+
+    if body.get("stream"):
+        return StreamingResponse(stream_chunks(model, reply), media_type="text/event-stream")
+
+    # Simulate prefill plus generating the whole reply
+    tokens = len(reply.get("content") or "") // 4 or 10
+    await asyncio.sleep((config.latency_ms + config.token_ms * tokens) / 1000)
+    return JSONResponse(full_response(model, reply))
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=config.latency_ms)
+    parser.add_argument("--token-ms", type=float, default=config.token_ms)
+    parser.add_argument("--error-rate", type=float, default=config.error_rate)
+    parser.add_argument("--slow-rate", type=float, default=config.slow_rate)
+    parser.add_argument("--slow-ms", type=float, default=config.slow_ms)
+    args = parser.parse_args()
+
+    config.latency_ms = args.latency_ms
+    config.token_ms = args.token_ms
+    config.error_rate = args.error_rate
+    config.slow_rate = args.slow_rate
+    config.slow_ms = args.slow_ms
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Soak test: SessionManager memory stays flat under sustained churn
+
+Creates a stream of new sessions with random-length messages, far more than
+the configured cap, and samples traced Python memory. Exits non-zero if
+memory after warm-up grows by more than --tolerance.
+
+Usage (from backend/):
+    python -m benchmarks.soak_session_manager [--sessions 200000] [--max-sessions 500]
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+from app.session_manager import SessionManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=200000)
+    parser.add_argument("--messages", type=int, default=6)
+    parser.add_argument("--max-sessions", type=int, default=500)
+    parser.add_argument("--max-bytes", type=int, default=2 * 1024 * 1024)
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    manager = SessionManager(max_sessions=args.max_sessions, max_bytes=args.max_bytes)
+    samples = []
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    for i in range(args.sessions):
+        session_id = f"session-{i}"
+        for _ in range(args.messages):
+            manager.add_message(session_id, "user", "x" * rng.randint(10, 2000))
+        # Occasionally revisit an older session, as a real client would
+        if i % 7 == 0:
+            manager.get_conversation(f"session-{rng.randint(0, i)}")
+        if i % (args.sessions // 20 or 1) == 0:
+            current, _ = tracemalloc.get_traced_memory()
+            samples.append(current)
+    elapsed = time.perf_counter() - started
+    tracemalloc.stop()
+
+    metrics = manager.metrics()
+    # Ignore the first quarter of samples while the store fills up
+    steady = samples[len(samples) // 4:]
+    growth = (steady[-1] - steady[0]) / steady[0]
+
+    print(f"{args.sessions} sessions in {elapsed:.1f}s "
+          f"({args.sessions * args.messages / elapsed:,.0f} messages/s)")
+    print(f"final sessions={metrics['session_count']} "
+          f"tracked bytes={metrics['memory_bytes']:,} evictions={metrics['evictions']}")
+    print("traced memory (KiB): " + ", ".join(f"{s // 1024}" for s in steady))
+    print(f"steady-state growth: {growth:+.1%} (tolerance {args.tolerance:.0%})")
+
+    if metrics["session_count"] > args.max_sessions or metrics["memory_bytes"] > args.max_bytes:
+        print("FAIL: caps exceeded")
+        return 1
+    if growth > args.tolerance:
+        print("FAIL: memory is not flat")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
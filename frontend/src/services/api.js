@@ -11,6 +11,16 @@ const api = axios.create({
   },
 });
 
+// After a write the API returns a signed marker; sending it back keeps this
+// user's reads off the lagging read replica on every server worker
+const STICKY_HEADER = 'X-Read-Primary-Until';
+
+const rememberStickyMarker = (marker) => {
+  if (marker) {
+    localStorage.setItem('readPrimaryUntil', marker);
+  }
+};
+
 // Request interceptor to add token
 api.interceptors.request.use(
   (config) => {
@@ -18,6 +28,10 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    const marker = localStorage.getItem('readPrimaryUntil');
+    if (marker) {
+      config.headers[STICKY_HEADER] = marker;
+    }
     return config;
   },
   (error) => {
@@ -27,7 +41,10 @@ api.interceptors.request.use(
 
 // Response interceptor for error handling
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    rememberStickyMarker(response.headers[STICKY_HEADER.toLowerCase()]);
+    return response;
+  },
   (error) => {
     if (error.response?.status === 401) {
       // Token expired or invalid
@@ -205,6 +222,17 @@ export const userAPI = {
     return response.data;
   },
 
+  // params: { search, role, is_active, cursor, limit }; nextCursor is null on the last page
+  getPage: async (params) => {
+    const response = await api.get('/api/users', { params });
+    return { users: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+  },
+
+  getSummary: async () => {
+    const response = await api.get('/api/users/summary');
+    return response.data;
+  },
+
   getById: async (id) => {
     const response = await api.get(`/api/users/${id}`);
     return response.data;
@@ -236,6 +264,60 @@ export const voiceAPI = {
     return response.data;
   },
 
+  // Streams the reply as server-sent events; onEvent(event, data) is called
+  // for each token/tool_call/tool_result event. Resolves with the final
+  // `done` payload (same shape as chat()).
+  chatStream: async (sessionId, message, onEvent) => {
+    const response = await fetch(`${API_BASE_URL}/api/voice/chat/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        Authorization: `Bearer ${localStorage.getItem('token')}`,
+        ...(localStorage.getItem('readPrimaryUntil') && {
+          [STICKY_HEADER]: localStorage.getItem('readPrimaryUntil'),
+        }),
+      },
+      body: JSON.stringify({ session_id: sessionId, message: message }),
+    });
+
+    if (!response.ok) {
+      throw new Error(`Voice stream failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let result = null;
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      const frames = buffer.split('\n\n');
+      buffer = frames.pop();
+
+      frames.forEach(frame => {
+        const eventLine = frame.split('\n').find(line => line.startsWith('event: '));
+        const dataLine = frame.split('\n').find(line => line.startsWith('data: '));
+        if (!eventLine || !dataLine) return;
+
+        const event = eventLine.slice(7);
+        const data = JSON.parse(dataLine.slice(6));
+        if (event === 'done') {
+          rememberStickyMarker(data.read_primary_until);
+          result = data;
+        } else if (event === 'error') {
+          throw new Error(data.detail);
+        } else if (onEvent) {
+          onEvent(event, data);
+        }
+      });
+    }
+
+    return result;
+  },
+
   resetSession: async (sessionId) => {
     const response = await api.post('/api/voice/reset-session', { 
       session_id: sessionId 